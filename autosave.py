@@ -0,0 +1,104 @@
+"""Background autosave.
+
+request() marks that an autosave is due; the overworld services it at the end
+of its next update, a safe point where no handler is half-way through
+changing state. Only savegame.snapshot() runs on the main thread; encoding,
+zlib compression and the atomic write happen on a worker thread. Timings and
+sizes are reported to game.stats from the main thread (autosave_snapshot_ms,
+autosave_write_ms, autosave_bytes).
+"""
+import threading
+import time
+from collections import deque
+import savegame
+
+# Upper bound (seconds) close() waits for pending writes at shutdown
+CLOSE_TIMEOUT = 5.0
+
+
+class Autosaver:
+    def __init__(self, game, path=None, compress=True):
+        self.game = game
+        self.path = path or savegame.AUTOSAVE_PATH
+        self.compress = compress
+        self.requested = False
+        self.saves = 0
+        self.errors = deque()
+        self._pending = None  # newest snapshot not yet picked up by the worker
+        self._busy = False
+        self._results = deque()  # (write_ms, bytes) handed back to the main thread
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def request(self):
+        self.requested = True
+
+    def service(self, ow):
+        """Called by the overworld once per update: take the snapshot if one was
+        requested and publish finished saves to instrumentation."""
+        while self._results:
+            write_ms, size = self._results.popleft()
+            self.game.stats.record("autosave_write_ms", write_ms)
+            self.game.stats.record("autosave_bytes", size)
+            self.saves += 1
+        while self.errors:
+            self.errors.popleft()
+            self.game.stats.record("autosave_errors", 1)
+        if not self.requested:
+            return
+        self.requested = False
+        t0 = time.perf_counter()
+        savegame.release_mapping(ow, self.path)
+        snap = savegame.snapshot(ow)
+        self.game.stats.record("autosave_snapshot_ms", (time.perf_counter() - t0) * 1000.0)
+        self._submit(snap)
+
+    def _submit(self, snap):
+        with self._cond:
+            # A newer snapshot supersedes one still waiting to be written
+            self._pending = snap
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="autosave", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                snap, self._pending = self._pending, None
+                self._busy = True
+            t0 = time.perf_counter()
+            try:
+                data = savegame.encode(snap, compress=self.compress)
+                savegame.write_atomic(self.path, data)
+                self._results.append(((time.perf_counter() - t0) * 1000.0, len(data)))
+            except Exception as e:
+                # Any failure is reported, never allowed to kill the worker with
+                # _busy still set (flush() would then wait forever)
+                self.errors.append(e)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until every submitted snapshot is on disk."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Finish outstanding saves and stop the worker, waiting at most
+        timeout seconds so a stuck write can never hang shutdown."""
+        deadline = time.perf_counter() + timeout
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(max(0.0, deadline - time.perf_counter()))
+            self._thread = None
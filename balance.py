@@ -0,0 +1,232 @@
+"""Vectorized Monte Carlo encounter-balance simulator.
+
+Runs N battles at once as NumPy arrays using the battle_core formulas: enemy
+spawns as in spawn_enemies, damage/heal as in BattleModel.perform, players on
+greedy_policy and enemies on random_enemy_policy (AI level 0; the search AI
+of harder biomes is not modelled). Reports win rates, turns-to-kill and
+XP-per-minute by biome and elapsed minutes.
+
+    python balance.py --n 1000000 --minutes 0 5 10 20 --levels 1 1
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import battle_core as bc
+from entities import Character, LEARN_SET
+from mapgen import SAFE_BIOMES
+
+MAX_ENEMIES = 3
+MAX_TURNS = 400
+STEPS_PER_MINUTE = 120  # assumed overworld walking pace for XP/minute
+
+
+def abilities_at_level(level):
+    """Abilities a character started at level 1 has by the time it reaches level."""
+    abilities = list(Character("sim").abilities)
+    abilities += [ab for req, ab in LEARN_SET if req <= level]
+    return abilities
+
+
+def party_stats(levels):
+    """(max_hp, attack_power, heal_power) arrays for party members leveled by XP."""
+    max_hp, attack, heal = [], [], []
+    for level in levels:
+        c = Character("sim")
+        max_hp.append(c.max_hp + 6 * (level - 1))
+        abilities = abilities_at_level(level)
+        attacks = [a.power for a in abilities if not a.heal]
+        heals = [a.power for a in abilities if a.heal]
+        attack.append(max(attacks) if attacks else 0)
+        heal.append(max(heals) if heals else 0)
+    return np.array(max_hp), np.array(attack), np.array(heal)
+
+
+def expected_steps_between_encounters(minutes, base=0.05):
+    # E[steps] under the per-step hazard from battle_core.encounter_chance
+    survive, expect, k = 1.0, 0.0, 0
+    while survive > 1e-9:
+        k += 1
+        h = min(1.0, bc.encounter_chance(minutes, k, base))
+        expect += k * survive * h
+        survive *= 1.0 - h
+    return expect
+
+
+def _nth_true(mask, n):
+    # Column index of the n-th (0-based) True per row
+    return np.argmax(np.cumsum(mask, axis=1) > n[:, None], axis=1)
+
+
+def simulate(biome, minutes, n, levels=(1,), seed=None):
+    """Simulate n encounters in biome at the given elapsed minutes.
+    Returns per-battle arrays: win (bool), turns, xp (0 for losses)."""
+    rng = np.random.default_rng(seed)
+    levels = np.asarray(levels)
+    P = len(levels)
+    p_max, p_atk, p_heal = party_stats(levels)
+    e_level = max(1, int(minutes // 5) + 1)
+
+    # Spawn: size, then per-enemy HP = hp_by_elapsed_minutes(randint(38, 72), minutes)
+    max_size = 2 if biome in ("plains", "forest") else MAX_ENEMIES
+    size = rng.integers(1, max_size + 1, size=n)
+    lo, hi = bc.ENEMY_BASE_HP
+    e_hp_all = (rng.integers(lo, hi + 1, size=(n, MAX_ENEMIES)) + minutes * 5
+                + rng.integers(-3, 4, size=(n, MAX_ENEMIES))).astype(np.int64)
+    e_exists = np.arange(MAX_ENEMIES)[None, :] < size[:, None]
+    e_hp_all[~e_exists] = 0
+
+    p_hp_all = np.tile(p_max, (n, 1)).astype(np.int64)
+    win_all = np.zeros(n, dtype=bool)
+    turns_all = np.zeros(n, dtype=np.int64)
+    live_rows = np.arange(n)
+    enemy_powers = np.array([a.power for a in bc.enemy_abilities()])
+    big = np.iinfo(np.int64).max
+
+    while len(live_rows):
+        # Work on the unfinished battles only, then write them back
+        p_hp, e_hp, turns = p_hp_all[live_rows], e_hp_all[live_rows], turns_all[live_rows]
+        m = len(live_rows)
+        done = np.zeros(m, dtype=bool)
+        win = np.zeros(m, dtype=bool)
+        # Fixed cycle P0 E0 P1 E1 ..., as BattleModel's scheduler runs it at equal
+        # speeds: the dead are skipped and everyone else keeps their place
+        for k in range(max(P, MAX_ENEMIES)):
+            if k < P:
+                act = ~done & (p_hp[:, k] > 0)
+                r = np.flatnonzero(act)
+                if len(r):
+                    a = np.full(len(r), k)
+                    lvl = levels[a]
+                    alive = p_hp[r] > 0
+                    hurt = alive & (p_hp[r] * 3 < p_max[None, :])
+                    heal = (p_heal[a] > 0) & hurt.any(axis=1)
+                    # Heal the lowest hurt ally
+                    hr = r[heal]
+                    if len(hr):
+                        t = np.argmin(np.where(hurt[heal], p_hp[hr], big), axis=1)
+                        amount = np.maximum(1, p_heal[a[heal]] + lvl[heal] * bc.HEAL_LEVEL_MULT)
+                        p_hp[hr, t] = np.minimum(p_max[t], p_hp[hr, t] + amount)
+                    # Otherwise hit the weakest enemy with the strongest attack
+                    ar = r[~heal]
+                    if len(ar):
+                        t = np.argmin(np.where(e_hp[ar] > 0, e_hp[ar], big), axis=1)
+                        roll = rng.integers(-bc.PLAYER_SPREAD, bc.PLAYER_SPREAD + 1, size=len(ar))
+                        dmg = np.maximum(1, p_atk[a[~heal]] + lvl[~heal] * bc.PLAYER_LEVEL_MULT + roll)
+                        e_hp[ar, t] = np.maximum(0, e_hp[ar, t] - dmg)
+                    turns[r] += 1
+                    won = np.zeros(m, dtype=bool)
+                    won[r] = ~(e_hp[r] > 0).any(axis=1)
+                    win |= won
+                    done |= won
+            if k < MAX_ENEMIES:
+                act = ~done & (e_hp[:, k] > 0)
+                r = np.flatnonzero(act)
+                if len(r):
+                    alive = p_hp[r] > 0
+                    pick = rng.integers(0, alive.sum(axis=1))
+                    t = _nth_true(alive, pick)
+                    power = enemy_powers[rng.integers(0, len(enemy_powers), size=len(r))]
+                    roll = rng.integers(-bc.ENEMY_SPREAD, bc.ENEMY_SPREAD + 1, size=len(r))
+                    dmg = np.maximum(1, power + e_level * bc.ENEMY_LEVEL_MULT + roll)
+                    p_hp[r, t] = np.maximum(0, p_hp[r, t] - dmg)
+                    turns[r] += 1
+                    done[r] |= ~(p_hp[r] > 0).any(axis=1)
+        p_hp_all[live_rows], e_hp_all[live_rows], turns_all[live_rows] = p_hp, e_hp, turns
+        win_all[live_rows] = win
+        live_rows = live_rows[~done & (turns < MAX_TURNS)]
+
+    win, turns = win_all, turns_all
+    # Victory XP, as in battle_core.xp_reward
+    per_enemy = np.maximum(5, e_level * 6 + rng.integers(-2, 7, size=(n, MAX_ENEMIES)))
+    xp = (np.where(e_exists, per_enemy, 0).sum(axis=1) * (1.0 + min(1.5, minutes * 0.05))).astype(np.int64)
+    xp[~win] = 0
+    return {"win": win, "turns": turns, "xp": xp}
+
+
+def summarize(result, minutes, biome, levels):
+    win, turns, xp = result["win"], result["turns"], result["xp"]
+    n = len(win)
+    win_rate = float(win.mean()) if n else 0.0
+    xp_per_win = float(xp[win].mean()) if win.any() else 0.0
+    if biome in SAFE_BIOMES:
+        per_minute = 0.0  # no random encounters in towns/cities
+    else:
+        per_minute = STEPS_PER_MINUTE / expected_steps_between_encounters(minutes)
+    xp_to_next = Character("sim", level=int(min(levels))).xp_to_next()
+    xp_per_minute = win_rate * xp_per_win * per_minute
+    return {
+        "biome": biome,
+        "minutes": minutes,
+        "n": n,
+        "win_rate": win_rate,
+        "turns_to_kill": float(turns[win].mean()) if win.any() else None,
+        "turns_p95": float(np.percentile(turns[win], 95)) if win.any() else None,
+        "xp_per_win": xp_per_win,
+        "encounters_per_minute": per_minute,
+        "xp_per_minute": xp_per_minute,
+        "minutes_to_level": xp_to_next / xp_per_minute if xp_per_minute else None,
+    }
+
+
+def _simulate_job(args):
+    return simulate(*args)
+
+
+def run_config(biome, minutes, n, levels, seed=None, workers=1, pool=None):
+    """Simulate and summarize one (biome, minutes) cell, optionally across a process pool."""
+    if pool is None or workers <= 1:
+        result = simulate(biome, minutes, n, levels, seed)
+    else:
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        sizes = [n // workers + (1 if i < n % workers else 0) for i in range(workers)]
+        jobs = [(biome, minutes, size, levels, s) for size, s in zip(sizes, seeds)]
+        parts = list(pool.map(_simulate_job, jobs))
+        result = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    return summarize(result, minutes, biome, levels)
+
+
+def sweep(biomes, minutes_list, n, levels, seed=0, workers=1):
+    rows = []
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for bi, biome in enumerate(biomes):
+            for mi, minutes in enumerate(minutes_list):
+                rows.append(run_config(biome, minutes, n, levels, seed=(seed, bi, mi), workers=workers, pool=pool))
+    finally:
+        if pool:
+            pool.shutdown()
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Monte Carlo encounter balance report")
+    ap.add_argument("--n", type=int, default=100000, help="encounters per (biome, minutes) cell")
+    ap.add_argument("--biomes", nargs="*", default=list(bc.ENEMY_TABLE))
+    ap.add_argument("--minutes", nargs="*", type=float, default=[0, 5, 10, 20, 30])
+    ap.add_argument("--levels", nargs="*", type=int, default=[1], help="party member levels")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1, help="fan out across a process pool")
+    ap.add_argument("--json", help="also write the rows to this path")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    rows = sweep(args.biomes, args.minutes, args.n, args.levels, args.seed, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{'biome':<10}{'min':>6}{'win%':>8}{'ttk':>7}{'xp/win':>9}{'xp/min':>9}{'min/lvl':>9}")
+    for r in rows:
+        ttk = f"{r['turns_to_kill']:.1f}" if r["turns_to_kill"] is not None else "-"
+        mtl = f"{r['minutes_to_level']:.1f}" if r["minutes_to_level"] else "-"
+        print(f"{r['biome']:<10}{r['minutes']:>6.0f}{100*r['win_rate']:>8.1f}{ttk:>7}"
+              f"{r['xp_per_win']:>9.1f}{r['xp_per_minute']:>9.1f}{mtl:>9}")
+    total = args.n * len(rows)
+    print(f"{total} encounters in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
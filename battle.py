@@ -1,49 +1,54 @@
-import pygame, random
+import pygame
 from utils.assets import load_sprite_for, scale_to_fit
-from entities import Monster, Ability, BASIC_ABILITIES, hp_by_elapsed_minutes
+from utils.fonts import get_font, render_text
+from battle_core import BattleModel, ENEMY_TABLE, spawn_enemies
+from battle_ai import enemy_policy_for
 from dialogue import DialogueBox
 
 class Battle:
-    ENEMY_TABLE = {
-        "plains": [("Boar", 3), ("Slime", 4), ("Warg", 2)],
-        "forest": [("Warg", 3), ("Kobold", 3), ("Wisp", 2)],
-        "desert": [("Scarab", 3), ("Sand Wisp", 3), ("Jackal", 2)],
-        "swamp": [("Ghoul", 3), ("Wisp", 3), ("Sludge", 2)],
-        "water": [("Piranha", 3), ("Mud Crab", 3), ("Wisp", 1)],
-        "mountain": [("Golem", 2), ("Kobold", 3), ("Griff", 1)],
-        "town": [("Rowdy", 1)],
-        "city": [("Mugger", 1)],
-        "dungeon": [("Mimic", 2), ("Ghoul", 3), ("Warg", 2)],
-    }
-
-    def __init__(self, game, overworld, party, biome=None):
+    """View/controller over a battle_core.BattleModel: input, dialogue and drawing."""
+    ENEMY_TABLE = ENEMY_TABLE
+
+    def __init__(self, game, overworld=None, party=None, biome=None, enemies=None):
+        # Fonts, dialogue box and RNG are built once; reset() starts each encounter.
+        # Constructing without a party gives a pre-warmed scene to reset later.
         self.game = game
+        self.font = get_font(22)
+        self.bigfont = get_font(28)
+        self.dialogue = DialogueBox((self.game.screen.get_width(), self.game.screen.get_height()))
+        self.rng = game.rng("battle")
+        self.model = None
+        if party is not None:
+            self.reset(overworld, party, biome, enemies)
+
+    def reset(self, overworld, party, biome=None, enemies=None):
+        """Start a new encounter in this scene; enemies pre-rolled by the
+        overworld are used as-is, otherwise they are spawned now."""
         self.overworld = overworld
         self.party = party
-        self.font = pygame.font.SysFont(None, 22)
-        self.bigfont = pygame.font.SysFont(None, 28)
 
         # Turn system: one actor acts at a time; a round is everyone acting once
         self.phase = "turn"  # "turn" or "message"
-        self.turn_queue = []
-        self.turn_index = 0
         self.action_index = 0   # kept for backward-compat with some UI logic (unused in new flow)
         self.ability_choice = None
         self.target_index = 0
         self.message = None
+        self.dialogue.active = False
+        self.dialogue.on_close = None
 
         self.biome = biome
-        self.enemies = self._spawn_enemies()
-        # Preload sprites
+        # Rules live in the model; player turns are driven by input, not its policy
+        self.rng = self.game.rng("battle")  # the streams are replaced when a save is loaded
+        if enemies is None:
+            enemies = self._spawn_enemies()
+        self.model = BattleModel(party, enemies, policy=None, rng=self.rng, enemy_policy=enemy_policy_for(biome))
+        # Sprites (normally already loaded when the encounter was pre-rolled)
         for e in self.enemies:
-            e.sprite = load_sprite_for("enemies", e.name)
+            if getattr(e, 'sprite', None) is None:
+                e.sprite = load_sprite_for("enemies", e.name)
         for m in self.party.members:
             if not hasattr(m, 'sprite') or m.sprite is None:
                 m.sprite = load_sprite_for("characters", m.name)
-        self.victory = None  # True/False when over
-        self.dialogue = DialogueBox((self.game.screen.get_width(), self.game.screen.get_height()))
-        # Build initial round order
-        self._build_turn_queue()
 
     def enter(self, **kwargs):
         pass
@@ -51,47 +56,22 @@ class Battle:
     def exit(self):
         pass
 
+    @property
+    def enemies(self):
+        return self.model.enemies
+
+    @property
+    def victory(self):
+        return self.model.victory
+
     def _spawn_enemies(self):
-        minutes = self.game.elapsed_minutes()
-        biome = (self.biome or "plains")
-        pool = self.ENEMY_TABLE.get(biome, self.ENEMY_TABLE["plains"])
-        size = random.randint(1, 2 if biome in ("plains", "forest") else 3)
-        enemies = []
-        names, weights = zip(*pool)
-        for i in range(size):
-            name = random.choices(names, weights=weights, k=1)[0]
-            base_hp = random.randint(38, 72)
-            hp = hp_by_elapsed_minutes(base_hp, minutes)
-            level = max(1, int(minutes//5) + 1)
-            abilities = [Ability("Claw", power=8), Ability("Bite", power=12)]
-            enemies.append(Monster(name, level, hp, abilities=abilities, is_player=False))
-        return enemies
-
-    def _build_turn_queue(self):
-        # Interleave party and enemies so actions alternate when possible
-        party_alive = [m for m in self.party.members if m.alive]
-        enemies_alive = [e for e in self.enemies if e.alive]
-        self.turn_queue = []
-        for i in range(max(len(party_alive), len(enemies_alive))):
-            if i < len(party_alive):
-                self.turn_queue.append(party_alive[i])
-            if i < len(enemies_alive):
-                self.turn_queue.append(enemies_alive[i])
-        self.turn_index = 0
+        return spawn_enemies(self.biome, self.game.elapsed_minutes(), self.rng)
 
     def _current_actor(self):
-        # Skip dead actors and advance as needed
-        while self.turn_index < len(self.turn_queue) and not self.turn_queue[self.turn_index].alive:
-            self.turn_index += 1
-        if self.turn_index >= len(self.turn_queue):
-            return None
-        return self.turn_queue[self.turn_index]
+        return self.model.current_actor()
 
     def _advance_turn(self):
-        self.turn_index += 1
-        # End of round → rebuild queue for next round
-        if self.turn_index >= len(self.turn_queue):
-            self._build_turn_queue()
+        self.model.advance_turn()
         # Reset per-turn selection
         self.ability_choice = None
         self.target_index = 0
@@ -101,18 +81,11 @@ class Battle:
         self._advance_turn()
 
     def _give_xp_reward(self):
-        minutes = self.game.elapsed_minutes()
-        base = sum(max(5, e.level*6 + random.randint(-2, 6)) for e in self.enemies)
-        reward = int(base * (1.0 + min(1.5, minutes*0.05)))
-        leveled_any = False
-        for m in self.party.alive_members():
-            if m.gain_xp(reward):
-                leveled_any = True
-        return reward, leveled_any
+        return self.model.award_xp(self.game.elapsed_minutes())
 
     def _check_over(self):
-        if all(not e.alive for e in self.enemies):
-            self.victory = True
+        over = self.model.check_over()
+        if over is True:
             self.phase = "message"
             reward, leveled = self._give_xp_reward()
             msg = f"Victory! +{reward} XP to living members."
@@ -122,25 +95,29 @@ class Battle:
             qmsgs = self.overworld.quests.on_enemy_defeated_batch(self.enemies, self.biome)
             self.message = msg
             self.dialogue.open([self.message] + qmsgs if qmsgs else [self.message])
-        elif self.party.is_wiped():
-            self.victory = False
+        elif over is False:
             self.phase = "message"
             self.message = "Your party has fallen..."
             self.dialogue.open([self.message],)
 
-    def _do_enemy_turn(self, enemy_actor):
-        targets = [m for m in self.party.alive_members()]
-        if not targets:
-            self._check_over()
-            return
-        t = random.choice(targets)
-        ability = random.choice(enemy_actor.abilities)
-        dmg = max(1, ability.power + enemy_actor.level * 2 + random.randint(-3, 3))
-        t.take_damage(dmg)
-        # Show a quick dialogue message
+    def _show_event(self, event):
+        # Show a quick dialogue message for a resolved action
         self.phase = "message"
-        self.message = f"{enemy_actor.name} used {ability.name} on {t.name} (-{dmg})."
+        self.message = event.message
         self.dialogue.open([self.message])
+
+    def _do_enemy_turn(self, enemy_actor):
+        event = self.model.enemy_turn(enemy_actor)
+        ai = getattr(self.model.enemy_policy, "last", None)
+        if ai is not None:
+            # Search cost per decision, so a budget overrun shows up next to the frame times
+            self.game.stats.record("enemy_ai_ms", ai["ms"])
+            self.game.stats.record("enemy_ai_nodes", ai["nodes"])
+            self.game.stats.record("enemy_ai_depth", ai["depth"])
+            if ai["timed_out"]:
+                self.game.stats.record("enemy_ai_timeouts", 1)
+        if event:
+            self._show_event(event)
         self._check_over()
 
     def handle_event(self, event):
@@ -162,7 +139,7 @@ class Battle:
                         back_to_menu(self.game)
                 else:
                     # continue battle flow to next actor
-                    if any(e.alive for e in self.enemies) and any(m.alive for m in self.party.members):
+                    if self.model.enemy_store.alive_count and not self.party.is_wiped():
                         self.phase = "turn"
                         self._advance_turn()
             return
@@ -188,10 +165,7 @@ class Battle:
                     return
 
                 # Choose target with arrows, ENTER to confirm
-                if self.ability_choice.target == "enemy":
-                    targets = [x for x in self.enemies if x.alive]
-                else:
-                    targets = [x for x in self.party.alive_members()]
+                targets = self.model.targets_for(self.ability_choice)
 
                 if event.key in (pygame.K_UP, pygame.K_w):
                     self.target_index = (self.target_index - 1) % len(targets)
@@ -199,30 +173,38 @@ class Battle:
                     self.target_index = (self.target_index + 1) % len(targets)
                 elif event.key in (pygame.K_RETURN,):
                     target = targets[self.target_index]
-                    if self.ability_choice.heal:
-                        amount = max(1, self.ability_choice.power + actor.level*2)
-                        target.heal(amount)
-                        self.phase = "message"
-                        self.message = f"{actor.name} cast {self.ability_choice.name} on {target.name} (+{amount})."
-                        self.dialogue.open([self.message])
-                    else:
-                        dmg = max(1, self.ability_choice.power + actor.level*3 + random.randint(-4, 4))
-                        target.take_damage(dmg)
-                        self.phase = "message"
-                        self.message = f"{actor.name} used {self.ability_choice.name} on {target.name} (-{dmg})."
-                        self.dialogue.open([self.message])
+                    self._show_event(self.model.perform(actor, self.ability_choice, target))
 
                     # Clear choice and advance
                     self.ability_choice = None
                     self._check_over()
 
     def update(self, dt):
-        self.dialogue.update(dt)
+        if self.dialogue.update(dt):
+            self.game.invalidate(self.dialogue.rect)
         if self.phase != "message":
             actor = self._current_actor()
             if actor and not getattr(actor, 'is_player', False):
                 # Auto-execute AI turn
                 self._do_enemy_turn(actor)
+                self.game.invalidate()
+
+    def idle(self):
+        # Idle while waiting for the player: a typed-out message or a party member's turn
+        if self.dialogue.typing:
+            return False
+        if self.phase == "message":
+            return True
+        actor = self._current_actor()
+        return actor is None or getattr(actor, 'is_player', False)
+
+    def draw_partial(self, screen, rects):
+        # The dialogue box is opaque and drawn last
+        box = self.dialogue.rect
+        if not self.dialogue.active or not all(box.contains(r) for r in rects):
+            return False
+        self.dialogue.draw(screen, self.game.alpha)
+        return True
 
     def draw(self, screen):
         screen.fill((10, 10, 20))
@@ -239,7 +221,7 @@ class Battle:
                 screen.blit(sprite, (rect.x + (rect.width - sprite.get_width())//2, rect.y + (rect.height - sprite.get_height())//2))
             self._draw_bar(screen, ex+10, ey + i*80 + 35, 200, 12, e.hp, e.max_hp)
             label = f"{e.name} Lv{e.level} HP {e.hp}/{e.max_hp}"
-            img = self.font.render(label, True, (255,255,255))
+            img = render_text(self.font, label, (255,255,255))
             screen.blit(img, (ex+10, ey + i*80 + 8))
 
         # Draw party (left side)
@@ -255,7 +237,7 @@ class Battle:
                 screen.blit(sprite, (rect.x + (rect.width - sprite.get_width())//2, rect.y + (rect.height - sprite.get_height())//2))
             self._draw_bar(screen, px+10, py + i*80 + 35, 200, 12, m.hp, m.max_hp)
             label = f"{m.name} Lv{m.level} HP {m.hp}/{m.max_hp}"
-            img = self.font.render(label, True, (255,255,255))
+            img = render_text(self.font, label, (255,255,255))
             screen.blit(img, (px+10, py + i*80 + 8))
 
         # Ability panel for current player-controlled actor
@@ -263,17 +245,17 @@ class Battle:
         if self.phase != "message" and actor and getattr(actor, 'is_player', False):
                 panel_y = screen.get_height() - 180
                 pygame.draw.rect(screen, (30, 30, 45), (0, panel_y, screen.get_width(), 180))
-                title = self.bigfont.render(f"{actor.name}'s turn — choose ability (1-9)", True, (255,255,255))
+                title = render_text(self.bigfont, f"{actor.name}'s turn — choose ability (1-9)", (255,255,255))
                 screen.blit(title, (20, panel_y + 10))
 
                 for i, ab in enumerate(actor.abilities):
                     line = f"{i+1}. {ab.name} ({'heal' if ab.heal else 'dmg'} {ab.power})"
-                    img = self.font.render(line, True, (220,220,220))
+                    img = render_text(self.font, line, (220,220,220))
                     screen.blit(img, (40, panel_y + 50 + i*22))
 
                 if self.ability_choice is not None:
-                    targets = [x for x in (self.enemies if self.ability_choice.target=='enemy' else self.party.members) if x.alive]
-                    info = self.font.render("Use Up/Down to select target, Enter to confirm.", True, (255,255,255))
+                    targets = self.model.targets_for(self.ability_choice)
+                    info = render_text(self.font, "Use Up/Down to select target, Enter to confirm.", (255,255,255))
                     screen.blit(info, (20, panel_y + 130))
 
                     # highlight target block
@@ -289,7 +271,7 @@ class Battle:
                         pygame.draw.rect(screen, (255,255,0), rect, 3)
 
         # Dialogue/message overlay
-        self.dialogue.draw(screen)
+        self.dialogue.draw(screen, self.game.alpha)
 
     def _draw_bar(self, screen, x, y, w, h, value, max_value):
         ratio = 0 if max_value <= 0 else value / max_value
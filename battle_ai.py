@@ -0,0 +1,255 @@
+"""Enemy AI: a time-budgeted expectimax search over the battle_core rules.
+
+Enemies pick the (ability, target) with the best expected outcome a few turns
+ahead. The turn order comes from the scheduler's preview, party members are
+assumed to play greedy_policy, and damage rolls are chance nodes sampled at a
+few points of their spread. Search deepens one turn at a time until the
+level's node cap, and the move from the deepest finished pass is played. Only
+the node cap ends a search, so the chosen move depends on nothing but the
+battle state and replays stay bit-identical. The caps are sized to finish well
+inside BUDGET_MS; a decision that still overruns it is only counted
+(EnemyAI.timeouts), never cut short.
+
+Visited states are memoized in TABLE, an LRU transposition table shared by all
+levels and cleared whenever a new battle starts using it. Battle records
+enemy_ai_ms, enemy_ai_nodes and enemy_ai_depth per decision to game.stats;
+TABLE.stats() has the hit rate.
+"""
+import time
+from collections import OrderedDict, namedtuple
+from battle_core import (ENEMY_AI_LEVEL, ENEMY_LEVEL_MULT, ENEMY_SPREAD, HEAL_LEVEL_MULT, PLAYER_LEVEL_MULT,
+                         PLAYER_SPREAD, random_enemy_policy)
+
+AIConfig = namedtuple("AIConfig", "max_depth max_nodes rolls")
+
+AI_LEVELS = {
+    1: AIConfig(max_depth=1, max_nodes=100, rolls=3),
+    2: AIConfig(max_depth=3, max_nodes=120, rolls=3),
+    3: AIConfig(max_depth=6, max_nodes=160, rolls=3),
+}
+BUDGET_MS = 2.0
+WIN = 100.0  # value of a wiped party (negated for a wiped enemy side)
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class TranspositionTable:
+    """LRU map from a search state to (depth searched, value)."""
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.owner = None  # the BattleModel whose states are stored
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, depth):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] >= depth:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, key, depth, value):
+        self._entries[key] = (depth, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+TABLE = TranspositionTable()
+
+
+def _rolls(spread, n):
+    # n evenly spaced samples of a uniform roll in [-spread, spread]
+    if n <= 1:
+        return (0,)
+    return tuple(round(-spread + 2 * spread * i / (n - 1)) for i in range(n))
+
+
+class EnemyAI:
+    """Enemy policy (model, actor) -> (ability, target) for one AI level."""
+
+    def __init__(self, level, budget_ms=BUDGET_MS, table=None):
+        self.level = level
+        self.config = AI_LEVELS[level]
+        self.budget_ms = budget_ms
+        self.table = table if table is not None else TABLE
+        self.decisions = 0
+        self.timeouts = 0
+        self.nodes = 0
+        self.last = {"ms": 0.0, "nodes": 0, "depth": 0, "timed_out": False}
+        self._model = None
+        self._player_rolls = _rolls(PLAYER_SPREAD, self.config.rolls)
+        self._enemy_rolls = _rolls(ENEMY_SPREAD, self.config.rolls)
+
+    def __call__(self, model, actor):
+        t0 = time.perf_counter()
+        self._prepare(model)
+        ph, eh = self._hp()
+        me = self._index[id(actor)]
+        moves = self._enemy_moves(me, ph, eh)
+        best, depth_done = self._fallback(me, ph), 0
+        self.nodes = 0
+        try:
+            for depth in range(1, self.config.max_depth + 1):
+                scores = [self._act(0, depth, ph, eh, me, ability, target) for ability, target in moves]
+                best = moves[scores.index(max(scores))]
+                depth_done = depth
+        except _OutOfBudget:
+            pass
+        ms = (time.perf_counter() - t0) * 1000.0
+        # Recorded only: the move above never depends on the clock
+        timed_out = ms > self.budget_ms
+        self.decisions += 1
+        self.timeouts += timed_out
+        self.last = {"ms": ms, "nodes": self.nodes, "depth": depth_done, "timed_out": timed_out}
+        ability, target = best
+        return ability, self._actors[target]
+
+    # ----- State -----
+    def _prepare(self, model):
+        if model is not self._model:
+            self._model = model
+            party, enemies = model.party.members, model.enemies
+            self._actors = list(party) + list(enemies)
+            self._np = len(party)
+            self._index = {id(c): i for i, c in enumerate(self._actors)}
+            self._max_hp = tuple(c.max_hp for c in self._actors)
+            self._inv_hp = tuple(1.0 / max(1, hp) for hp in self._max_hp)
+            self._levels = tuple(c.level for c in self._actors)
+            # Strongest attack and heal per actor (party members play these as greedy_policy does)
+            self._best = []
+            for c in self._actors:
+                heals = [a for a in c.abilities if a.heal]
+                attacks = [a for a in c.abilities if not a.heal] or c.abilities
+                self._best.append((max(attacks, key=lambda a: a.power) if attacks else None,
+                                   max(heals, key=lambda a: a.power) if heals else None))
+        if self.table.owner is not model:
+            # Keys only identify a state within one battle; older entries are dead
+            self.table.clear()
+            self.table.owner = model
+        seq = model.scheduler.upcoming(self.config.max_depth * 2 + 1)
+        self._seq = tuple(self._index[id(c)] for c in seq)
+        ph, eh = self._hp()
+        # Predicted order only holds while the same actors are alive
+        alive = sum(1 << i for i, hp in enumerate(ph + eh) if hp > 0)
+        self._root = (alive, model.scheduler.turns)
+
+    def _hp(self):
+        np_ = self._np
+        return (tuple(c.hp for c in self._actors[:np_]), tuple(c.hp for c in self._actors[np_:]))
+
+    def _enemy_moves(self, i, ph, eh):
+        # Abilities differ only in power, so the strongest attack and the
+        # strongest heal dominate the rest; only targets are worth branching on
+        attack, heal = self._best[i]
+        moves = []
+        if attack is not None:
+            moves += [(attack, j) for j, hp in enumerate(ph) if hp > 0]
+        if heal is not None:
+            moves += [(heal, self._np + j) for j, hp in enumerate(eh) if hp > 0]
+        return moves
+
+    def _fallback(self, i, ph):
+        # Before one full pass finishes: hardest hit on the weakest party member
+        attacks = [a for a in self._actors[i].abilities if not a.heal] or self._actors[i].abilities
+        target = min((hp, j) for j, hp in enumerate(ph) if hp > 0)[1]
+        return max(attacks, key=lambda a: a.power), target
+
+    def _greedy(self, i, ph, eh):
+        attack, heal = self._best[i]
+        if heal is not None:
+            hurt = [(hp, j) for j, hp in enumerate(ph) if 0 < hp and hp * 3 < self._max_hp[j]]
+            if hurt:
+                return heal, min(hurt)[1]
+        target = min((hp, j) for j, hp in enumerate(eh) if hp > 0)[1]
+        return attack, self._np + target
+
+    def _evaluate(self, ph, eh):
+        # From the enemies' side: party hp lost and members down, own hp kept
+        inv = self._inv_hp
+        party = sum(map(float.__mul__, inv, ph))
+        own = sum(map(float.__mul__, inv[self._np:], eh))
+        return ph.count(0) + 0.5 * own - party
+
+    # ----- Search -----
+    def _value(self, k, depth, ph, eh):
+        # Every visited state counts against the cap, leaves included
+        self.nodes += 1
+        if self.nodes > self.config.max_nodes:
+            raise _OutOfBudget
+        if not any(ph):
+            return WIN + depth  # sooner is better
+        if not any(eh):
+            return -WIN - depth
+        seq, np_ = self._seq, self._np
+        while k < len(seq) and (ph[seq[k]] if seq[k] < np_ else eh[seq[k] - np_]) <= 0:
+            k += 1  # died during the lookahead
+        if depth == 0 or k >= len(seq):
+            return self._evaluate(ph, eh)
+        key = (self._root, k, ph, eh)
+        value = self.table.get(key, depth)
+        if value is not None:
+            return value
+        i = seq[k]
+        if i < np_:
+            ability, target = self._greedy(i, ph, eh)
+            value = self._act(k, depth, ph, eh, i, ability, target)
+        else:
+            value = max(self._act(k, depth, ph, eh, i, ability, target)
+                        for ability, target in self._enemy_moves(i, ph, eh))
+        self.table.put(key, depth, value)
+        return value
+
+    def _act(self, k, depth, ph, eh, i, ability, target):
+        """Expected value of actor i using ability on target at turn k."""
+        np_ = self._np
+        on_party = target < np_
+        j = target if on_party else target - np_
+        hps = ph if on_party else eh
+        if ability.heal:
+            amount = max(1, ability.power + self._levels[i] * HEAL_LEVEL_MULT)
+            outcomes = [min(self._max_hp[target], hps[j] + amount)]
+        else:
+            mult, rolls = (PLAYER_LEVEL_MULT, self._player_rolls) if i < np_ else (ENEMY_LEVEL_MULT, self._enemy_rolls)
+            base = ability.power + self._levels[i] * mult
+            outcomes = [max(0, hps[j] - max(1, base + r)) for r in rolls]
+        total = 0.0
+        last = last_value = None
+        for hp in outcomes:
+            if hp != last:
+                # Rolls that leave the same hp share one subtree
+                new = hps[:j] + (hp,) + hps[j + 1:]
+                last, last_value = hp, (self._value(k + 1, depth - 1, new, eh) if on_party
+                                        else self._value(k + 1, depth - 1, ph, new))
+            total += last_value
+        return total / len(outcomes)
+
+
+_POLICIES = {}
+
+
+def enemy_policy_for(biome):
+    """The enemy policy for a biome's AI level (shared instances, one per level)."""
+    level = ENEMY_AI_LEVEL.get(biome or "plains", 0)
+    if level not in AI_LEVELS:
+        return random_enemy_policy
+    policy = _POLICIES.get(level)
+    if policy is None:
+        policy = _POLICIES[level] = EnemyAI(level)
+    return policy
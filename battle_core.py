@@ -0,0 +1,218 @@
+"""Pure-Python battle rules: no pygame, so battles can run headless.
+
+BattleModel takes a party, a list of enemies, a policy for player-controlled
+turns and a seed, and steps turns until one side is down. battle.Battle is a
+view/controller on top of it.
+"""
+import random
+from collections import namedtuple
+from entities import Monster, Ability, CombatantStore, DEFAULT_SPEED, hp_by_elapsed_minutes
+from scheduler import TurnScheduler
+
+ENEMY_TABLE = {
+    "plains": [("Boar", 3), ("Slime", 4), ("Warg", 2)],
+    "forest": [("Warg", 3), ("Kobold", 3), ("Wisp", 2)],
+    "desert": [("Scarab", 3), ("Sand Wisp", 3), ("Jackal", 2)],
+    "swamp": [("Ghoul", 3), ("Wisp", 3), ("Sludge", 2)],
+    "water": [("Piranha", 3), ("Mud Crab", 3), ("Wisp", 1)],
+    "mountain": [("Golem", 2), ("Kobold", 3), ("Griff", 1)],
+    "town": [("Rowdy", 1)],
+    "city": [("Mugger", 1)],
+    "dungeon": [("Mimic", 2), ("Ghoul", 3), ("Warg", 2)],
+}
+
+# Enemy AI level per biome (battle_ai.AI_LEVELS); 0 is the random policy balance.py models
+ENEMY_AI_LEVEL = {
+    "plains": 0, "forest": 0, "town": 0, "city": 0,
+    "desert": 1, "water": 1, "swamp": 1,
+    "mountain": 2, "dungeon": 3,
+}
+
+# Per-enemy speed overrides (unlisted enemies use DEFAULT_SPEED). balance.py
+# assumes every combatant has the same speed, so teach it speed before tuning these.
+ENEMY_SPEED = {}
+
+# Formula constants, shared with anything that re-implements the rules (e.g. balance sims)
+PLAYER_LEVEL_MULT, PLAYER_SPREAD = 3, 4
+ENEMY_LEVEL_MULT, ENEMY_SPREAD = 2, 3
+HEAL_LEVEL_MULT = 2
+ENEMY_BASE_HP = (38, 72)
+
+BattleEvent = namedtuple("BattleEvent", "actor ability target amount message")
+
+
+def enemy_pool(biome):
+    return ENEMY_TABLE.get(biome or "plains", ENEMY_TABLE["plains"])
+
+
+def enemy_abilities():
+    return [Ability("Claw", power=8), Ability("Bite", power=12)]
+
+
+def spawn_enemies(biome, minutes, rng=random):
+    biome = biome or "plains"
+    pool = enemy_pool(biome)
+    size = rng.randint(1, 2 if biome in ("plains", "forest") else 3)
+    enemies = []
+    store = CombatantStore()  # the wave shares one column store
+    names, weights = zip(*pool)
+    for i in range(size):
+        name = rng.choices(names, weights=weights, k=1)[0]
+        base_hp = rng.randint(*ENEMY_BASE_HP)
+        hp = hp_by_elapsed_minutes(base_hp, minutes, rng)
+        level = max(1, int(minutes//5) + 1)
+        enemies.append(Monster(name, level, hp, abilities=enemy_abilities(), is_player=False, store=store,
+                               speed=ENEMY_SPEED.get(name, DEFAULT_SPEED)))
+    return enemies
+
+
+def player_damage(ability, actor, rng=random):
+    return max(1, ability.power + actor.level*PLAYER_LEVEL_MULT + rng.randint(-PLAYER_SPREAD, PLAYER_SPREAD))
+
+
+def enemy_damage(ability, actor, rng=random):
+    return max(1, ability.power + actor.level*ENEMY_LEVEL_MULT + rng.randint(-ENEMY_SPREAD, ENEMY_SPREAD))
+
+
+def heal_amount(ability, actor):
+    return max(1, ability.power + actor.level*HEAL_LEVEL_MULT)
+
+
+def xp_reward(enemies, minutes, rng=random):
+    base = sum(max(5, e.level*6 + rng.randint(-2, 6)) for e in enemies)
+    return int(base * (1.0 + min(1.5, minutes*0.05)))
+
+
+def encounter_chance(minutes, steps, base=0.05):
+    # Per-step random encounter odds, rising slightly with time and steps
+    return base + min(0.25, minutes * 0.01) + steps * 0.003
+
+
+def random_enemy_policy(model, actor):
+    # Random living party member, random ability
+    target = model.rng.choice(model.party.alive_members())
+    ability = model.rng.choice(actor.abilities)
+    return ability, target
+
+
+def greedy_policy(model, actor):
+    """Simple player policy: heal a badly hurt ally, else hit the weakest enemy hardest."""
+    heals = [a for a in actor.abilities if a.heal]
+    hurt = [m for m in model.party.alive_members() if m.hp * 3 < m.max_hp]
+    if heals and hurt:
+        return max(heals, key=lambda a: a.power), min(hurt, key=lambda m: m.hp)
+    attacks = [a for a in actor.abilities if not a.heal] or actor.abilities
+    return max(attacks, key=lambda a: a.power), model.enemy_store.weakest()
+
+
+class BattleModel:
+    def __init__(self, party, enemies, policy=greedy_policy, seed=None, rng=None, enemy_policy=random_enemy_policy):
+        self.party = party
+        self.enemies = enemies
+        self.enemy_store = CombatantStore.of(enemies)
+        self.policy = policy
+        self.enemy_policy = enemy_policy
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.turns = 0
+        self.victory = None  # True/False when over
+        self.scheduler = TurnScheduler(self.initial_order())
+
+    # ----- Turn order -----
+    def initial_order(self):
+        # Interleave party and enemies so that, at equal speed, actions alternate
+        party_alive = self.party.alive_members()
+        enemies_alive = self.alive_enemies()
+        order = []
+        for i in range(max(len(party_alive), len(enemies_alive))):
+            if i < len(party_alive):
+                order.append(party_alive[i])
+            if i < len(enemies_alive):
+                order.append(enemies_alive[i])
+        return order
+
+    def current_actor(self):
+        if self.over:
+            return None
+        return self.scheduler.current()
+
+    def advance_turn(self):
+        self.scheduler.end_turn()
+
+    # ----- Rules -----
+    def alive_enemies(self):
+        return self.enemy_store.alive_members()
+
+    def targets_for(self, ability):
+        if ability.target == "enemy":
+            return self.alive_enemies()
+        return self.party.alive_members()
+
+    def perform(self, actor, ability, target):
+        """Apply one action and return the resulting BattleEvent."""
+        if ability.heal:
+            amount = heal_amount(ability, actor)
+            target.heal(amount)
+            verb = "cast" if actor.is_player else "used"
+            message = f"{actor.name} {verb} {ability.name} on {target.name} (+{amount})."
+        else:
+            if actor.is_player:
+                amount = player_damage(ability, actor, self.rng)
+            else:
+                amount = enemy_damage(ability, actor, self.rng)
+            target.take_damage(amount)
+            message = f"{actor.name} used {ability.name} on {target.name} (-{amount})."
+        self.turns += 1
+        self.check_over()
+        return BattleEvent(actor, ability, target, amount, message)
+
+    def enemy_turn(self, actor):
+        """Run an AI-controlled turn; None if there is nobody left to target."""
+        if self.party.is_wiped():
+            self.check_over()
+            return None
+        ability, target = self.enemy_policy(self, actor)
+        return self.perform(actor, ability, target)
+
+    def check_over(self):
+        if self.enemy_store.alive_count == 0:
+            self.victory = True
+        elif self.party.is_wiped():
+            self.victory = False
+        return self.victory
+
+    @property
+    def over(self):
+        return self.victory is not None
+
+    def award_xp(self, minutes):
+        """Grant the victory XP to living members; returns (reward, leveled_any)."""
+        reward = xp_reward(self.enemies, minutes, self.rng)
+        leveled_any = False
+        for m in self.party.alive_members():
+            if m.gain_xp(reward):
+                leveled_any = True
+        return reward, leveled_any
+
+    # ----- Headless stepping -----
+    def step(self):
+        """Resolve the current actor's turn using the policies and advance."""
+        if self.over:
+            return None
+        actor = self.current_actor()
+        if actor is None:
+            return None
+        if actor.is_player:
+            ability, target = self.policy(self, actor)
+            event = self.perform(actor, ability, target)
+        else:
+            event = self.enemy_turn(actor)
+        if not self.over:
+            self.advance_turn()
+        return event
+
+    def run(self, max_turns=10000):
+        """Step until one side is down (or max_turns); returns victory (None if unfinished)."""
+        while not self.over and self.turns < max_turns:
+            if self.step() is None and not self.over:
+                break
+        return self.victory
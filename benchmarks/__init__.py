@@ -0,0 +1,6 @@
+"""Fixed-seed benchmarks for the game's hot paths.
+
+    python -m benchmarks run --out benchmarks/baseline.json
+    python -m benchmarks run --compare benchmarks/baseline.json
+    python -m benchmarks compare old.json new.json --threshold 0.15
+"""
@@ -0,0 +1,46 @@
+import argparse
+import sys
+from . import runner
+
+
+def _print_comparison(rows, threshold):
+    print(f"{'workload':<32}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for name, base, cur, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<32}{base * 1e3:>10.3f}ms{cur * 1e3:>10.3f}ms{ratio:>8.2f}{flag}")
+    regressions = sum(1 for r in rows if r[4])
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    run_p = sub.add_parser("run", help="run the workloads")
+    run_p.add_argument("-k", dest="names", action="append", help="only workloads containing this substring")
+    run_p.add_argument("--out", help="write results as a JSON baseline")
+    run_p.add_argument("--compare", help="compare against this baseline JSON")
+    run_p.add_argument("--threshold", type=float, default=0.10)
+    run_p.add_argument("--min-time", type=float, default=0.2, help="seconds spent per workload")
+    run_p.add_argument("--repeats", type=int, default=5)
+    cmp_p = sub.add_parser("compare", help="compare two result files")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.10)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "compare":
+        rows = runner.compare(runner.load(args.baseline), runner.load(args.current), args.threshold)
+        return _print_comparison(rows, args.threshold)
+
+    results = runner.run(args.names, args.min_time, args.repeats)
+    if args.out:
+        runner.save(results, args.out)
+    if args.compare:
+        rows = runner.compare(runner.load(args.compare), results, args.threshold)
+        return _print_comparison(rows, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
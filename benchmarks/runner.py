@@ -0,0 +1,68 @@
+import json
+import platform
+import statistics
+import time
+from .workloads import WORKLOADS
+
+
+def time_workload(fn, min_time=0.2, repeats=5):
+    """Median and min seconds per call over `repeats` rounds of auto-sized batches."""
+    fn()  # warm up caches, lazy imports and first-use allocations
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time / repeats or number >= 1 << 20:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(repeats - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "number": number, "repeats": repeats}
+
+
+def run(names=None, min_time=0.2, repeats=5, log=print):
+    results = {}
+    for name, factory in WORKLOADS.items():
+        if names and not any(n in name for n in names):
+            continue
+        results[name] = time_workload(factory(), min_time, repeats)
+        log(f"{name:<32}{results[name]['median_s'] * 1e3:>10.3f} ms")
+    return {"meta": _meta(), "results": results}
+
+
+def _meta():
+    meta = {"python": platform.python_version(), "machine": platform.machine(), "platform": platform.platform()}
+    for mod in ("pygame", "numpy"):
+        try:
+            meta[mod] = __import__(mod).__version__
+        except ImportError:
+            pass
+    return meta
+
+
+def compare(baseline, current, threshold=0.10):
+    """Rows of (name, base_s, cur_s, ratio, regressed) for workloads in both runs."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        rows.append((name, base["median_s"], cur["median_s"], ratio, ratio > 1.0 + threshold))
+    return rows
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
@@ -0,0 +1,132 @@
+"""Benchmark workloads. Each factory does its setup once and returns the
+zero-argument callable that gets timed; all randomness is seeded."""
+import os
+import random
+
+SEED = 1234
+WORKLOADS = {}
+
+
+def workload(name):
+    def register(factory):
+        WORKLOADS[name] = factory
+        return factory
+    return register
+
+
+def _headless_game():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from engine import VirtualClock
+    from main import create_game, WIDTH, HEIGHT
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    return create_game(screen, clock=VirtualClock(), seed=SEED)
+
+
+def _overworld():
+    from overworld import Overworld
+    game = _headless_game()
+    ow = Overworld(game)
+    ow.dialogue.active = False
+    return game, ow
+
+
+def _offscreen(game):
+    import pygame
+    return pygame.Surface(game.screen.get_size())
+
+
+for _size in (64, 256, 1024):
+    def _make(size=_size):
+        from mapgen import generate_map
+        return lambda: generate_map(size, size, seed=SEED)
+    workload(f"generate_map_{_size}")(_make)
+
+
+@workload("overworld_draw")
+def overworld_draw():
+    game, ow = _overworld()
+    surface = _offscreen(game)
+    return lambda: ow.draw(surface)
+
+
+@workload("battle_draw")
+def battle_draw():
+    from battle import Battle
+    from entities import Character
+    game, ow = _overworld()
+    for name in ("Ari", "Mila", "Taro"):
+        ow.party.add(Character(name, level=3))
+    battle = Battle(game, ow, ow.party, "dungeon")
+    surface = _offscreen(game)
+    return lambda: battle.draw(surface)
+
+
+@workload("dialogue_wrap_pages")
+def dialogue_wrap_pages():
+    from dialogue import DialogueBox
+    _headless_game()
+    rng = random.Random(SEED)
+    words = ["the", "king", "scribe", "catacombs", "whispered", "confession", "blade", "realm", "captain", "cipher"]
+    script = [" ".join(rng.choice(words) for _ in range(rng.randint(5, 60))) for _ in range(400)]
+    box = DialogueBox((800, 600))
+    return lambda: box._wrap_into_pages(script)
+
+
+def _quest_manager_with(quests):
+    game, ow = _overworld()
+    for q in quests:
+        ow.quests.accept_quest(q)
+    return ow
+
+
+@workload("quests_enemy_defeated_batch")
+def quests_enemy_defeated_batch():
+    from quests import Quest, QuestType
+    from entities import Monster
+    rng = random.Random(SEED)
+    names = ["Boar", "Slime", "Warg", "Ghoul", "Mimic", "Kobold"]
+    biomes = ["plains", "forest", "swamp", "dungeon"]
+    quests = [Quest(f"H{i}", "Hunt", "", QuestType.HUNT, target=rng.choice(names),
+                    biome=rng.choice(biomes), count=10**9) for i in range(500)]
+    ow = _quest_manager_with(quests)
+    enemies = [Monster(rng.choice(names), 1, 0) for _ in range(3)]
+    return lambda: ow.quests.on_enemy_defeated_batch(enemies, "dungeon")
+
+
+@workload("quests_enter_tile")
+def quests_enter_tile():
+    from quests import Quest, QuestType
+    rng = random.Random(SEED)
+    quests = [Quest(f"R{i}", "Reach", "", QuestType.REACH, pos=(rng.randrange(64), rng.randrange(64)))
+              for i in range(500)]
+    ow = _quest_manager_with(quests)
+    # A tile no quest targets, so the workload never mutates the quest set
+    taken = {q.pos for q in quests}
+    free = next((x, y) for y in range(64) for x in range(64) if (x, y) not in taken)
+    return lambda: ow.quests.on_enter_tile(free[0], free[1], "plains")
+
+
+@workload("battle_model_raid")
+def battle_model_raid():
+    # Raid-sized headless battle: 16 party members against 300 enemies
+    from battle_core import BattleModel, enemy_abilities
+    from entities import Character, Monster, Party
+
+    def run():
+        rng = random.Random(SEED)
+        party = Party([Character(f"P{i}", level=8, max_hp=400) for i in range(16)], max_size=16)
+        enemies = [Monster(f"E{i}", 2, rng.randint(30, 60), abilities=enemy_abilities()) for i in range(300)]
+        BattleModel(party, enemies, seed=SEED).run()
+    return run
+
+
+@workload("character_gain_xp_large")
+def character_gain_xp_large():
+    from entities import Character
+
+    def run():
+        Character("Bench").gain_xp(500_000_000)
+    return run
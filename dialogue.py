@@ -1,13 +1,15 @@
 import pygame, textwrap
+from utils.fonts import get_font, render_text
 
 class DialogueBox:
     """Reusable dialogue box with typewriter effect and multi-page text.
     Call open(lines, on_close=None) to start; handle_event() to advance; draw() each frame.
+    The typewriter runs on update() time, so it types at the same speed at any frame rate.
     While active, you should pause player movement/inputs besides advancing dialogue.
     """
     def __init__(self, screen_size, font=None, margin=16):
         self.screen_w, self.screen_h = screen_size
-        self.font = font or pygame.font.SysFont(None, 24)
+        self.font = font or get_font(24)
         self.margin = margin
         self.active = False
         self.pages = []  # list of strings (one per page)
@@ -17,6 +19,7 @@ class DialogueBox:
         self.on_close = None
         self.box_height = int(self.screen_h * 0.32)
         self.tick_accum = 0.0
+        self._last_dt = 0.0
 
     def _wrap_into_pages(self, lines):
         # Wrap text to box width and split into pages that fit ~8 lines.
@@ -38,6 +41,7 @@ class DialogueBox:
         self.pages = self._wrap_into_pages(lines)
         self.page_idx = 0
         self.char_idx = 0
+        self.tick_accum = 0.0
         self.active = True
         self.on_close = on_close
 
@@ -54,6 +58,7 @@ class DialogueBox:
                 if self.page_idx < len(self.pages) - 1:
                     self.page_idx += 1
                     self.char_idx = 0
+                    self.tick_accum = 0.0
                 else:
                     self.active = False
                     if self.on_close:
@@ -61,20 +66,36 @@ class DialogueBox:
                         self.on_close = None
                         cb()
 
+    @property
+    def rect(self):
+        return pygame.Rect(0, self.screen_h - self.box_height, self.screen_w, self.box_height)
+
+    @property
+    def typing(self):
+        return self.active and self.char_idx < len(self.pages[self.page_idx])
+
     def update(self, dt):
-        if not self.active:
-            return
-        # typewriter
+        """Advance the typewriter; True if more text is now shown."""
+        if not self.typing:
+            return False
+        # typewriter; the part of a character not yet typed carries over
+        page = self.pages[self.page_idx]
         self.tick_accum += dt
-        speed = 60  # cps baseline
-        step = int(self.tick_accum * speed * (self.chars_per_tick/2))
+        self._last_dt = dt
+        cps = self._cps()
+        step = int(self.tick_accum * cps)
         if step > 0:
-            self.tick_accum = 0.0
-            page = self.pages[self.page_idx]
-            if self.char_idx < len(page):
-                self.char_idx = min(len(page), self.char_idx + step)
+            self.tick_accum -= step / cps
+            self.char_idx = min(len(page), self.char_idx + step)
+            return True
+        return False
+
+    def _cps(self):
+        return 60 * (self.chars_per_tick / 2)  # 60 cps baseline
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=0.0):
+        """alpha: fraction of an update elapsed since the last one (Game.alpha),
+        used to type ahead smoothly between updates."""
         if not self.active:
             return
         # box
@@ -86,14 +107,15 @@ class DialogueBox:
 
         # text
         page = self.pages[self.page_idx]
-        shown = page[:self.char_idx]
+        ahead = int((self.tick_accum + alpha * self._last_dt) * self._cps()) if self.char_idx < len(page) else 0
+        shown = page[:self.char_idx + ahead]
         lines = shown.split("\n")
         ty = y + 18
         for line in lines:
-            img = self.font.render(line, True, (235,235,235))
+            img = render_text(self.font, line, (235,235,235))
             screen.blit(img, (x + 20, ty))
             ty += self.font.get_height() + 4
 
         # continue tip
-        tip = self.font.render("Space/Enter to continue", True, (200,200,200))
+        tip = render_text(self.font, "Space/Enter to continue", (200,200,200))
         screen.blit(tip, (w - tip.get_width() - 24, y + h - tip.get_height() - 10))
@@ -1,4 +1,15 @@
 import pygame
+from instrumentation import FrameStats, CountingSurface, install_draw_counters
+from rngstreams import RngStreams
+from utils.fonts import get_font, render_text
+from utils.assets import SPRITES
+
+# Simulation runs in fixed ticks whatever the frame rate (see Game.advance)
+TICK_HZ = 60
+TICK_DT = 1.0 / TICK_HZ
+MAX_TICKS_PER_FRAME = 5  # further behind than this, the backlog's updates are dropped
+IDLE_WAIT_MS = 250  # longest the main loop sleeps waiting for input on a static screen
+MAX_DIRTY_RECTS = 16  # past this many, redraw the whole screen instead
 
 class State:
     def __init__(self, game):
@@ -19,15 +30,59 @@ class State:
     def draw(self, screen):
         pass
 
+    def idle(self):
+        # True when update() has nothing to do until input arrives
+        return False
+
+
+class RealClock:
+    """Wall-clock game time (pygame ticks)."""
+    def ticks_ms(self):
+        return pygame.time.get_ticks()
+
+
+class VirtualClock:
+    """Game time that only moves when advanced, for headless/uncapped runs.
+    Time-based scaling (elapsed_minutes) then follows simulated, not wall, time."""
+    def __init__(self, start_ms=0.0):
+        self.now_ms = float(start_ms)
+
+    def advance(self, dt):
+        self.now_ms += dt * 1000.0
+
+    def ticks_ms(self):
+        return self.now_ms
+
 
 class Game:
-    def __init__(self, screen, states, start_state=None):
+    def __init__(self, screen, states, start_state=None, stats_path=None, clock=None, seed=None):
         self.screen = screen
         self.states = states
         self.current = None
+        self.current_name = None
         self.running = True
         self.state_stack = []
-        self.time_started_ms = pygame.time.get_ticks()
+        self.clock = clock or RealClock()
+        self.time_started_ms = self.clock.ticks_ms()
+        # Per-subsystem seeded RNG streams (see rng())
+        self.rngs = RngStreams(seed)
+        self.autosaver = None  # autosave.Autosaver, when enabled (main.create_game)
+        # Fixed-step simulation: unsimulated frame time and how far into the next tick draw() is
+        self.ticks = 0
+        self.alpha = 0.0
+        self._accum = 0.0
+        # Redraw tracking: the whole screen, or just these rects (see invalidate)
+        self._full_redraw = True
+        self._dirty_rects = []
+
+        # Instrumentation: every state's event/update/draw is timed here, and
+        # draw calls/blits are counted through the screen proxy. F3 toggles the
+        # overlay; stats_path (.json or .csv) is written by shutdown().
+        self.stats = FrameStats()
+        self.stats_path = stats_path
+        self.show_stats = False
+        install_draw_counters(self.stats)
+        self._counting_screen = CountingSurface(screen, self.stats)
 
         # Delay setting the initial state until after states have their game
         # references injected. This prevents early state entry before the
@@ -39,21 +94,137 @@ class Game:
         if self.current:
             self.current.exit()
         self.current = self.states[name]
+        self.current_name = name
         self.current.enter(**kwargs)
+        self.invalidate()
+
+    def rng(self, name):
+        return self.rngs.get(name)
 
     def elapsed_minutes(self):
-        return max(0.0, (pygame.time.get_ticks() - self.time_started_ms) / 60000.0)
+        return max(0.0, (self.clock.ticks_ms() - self.time_started_ms) / 60000.0)
+
+    def invalidate(self, rect=None):
+        """Mark part of the screen (all of it if rect is None) for redrawing."""
+        if rect is None or len(self._dirty_rects) >= MAX_DIRTY_RECTS:
+            self._full_redraw = True
+            self._dirty_rects = []
+        elif not self._full_redraw:
+            self._dirty_rects.append(pygame.Rect(rect))
+
+    @property
+    def dirty(self):
+        return self._full_redraw or bool(self._dirty_rects) or self.show_stats
+
+    def idle(self):
+        """True when the current state's update has nothing to do until input
+        arrives. Depends on game state only, so replays see the same answer."""
+        idle = getattr(self.current, "idle", None)
+        return bool(idle and idle())
+
+    def can_sleep(self):
+        # Nothing to simulate, redraw or finish loading: safe to block on input
+        return self.idle() and not self.dirty and not SPRITES.busy()
 
     def handle_event(self, event):
+        if event.type != pygame.MOUSEMOTION:
+            self.invalidate()  # input can change anything on screen
         if event.type == pygame.QUIT:
             self.running = False
         elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
             self.running = False
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.show_stats = not self.show_stats
         else:
-            self.current.handle_event(event)
+            with self.stats.timer(self.current_name, "event"):
+                self.current.handle_event(event)
+
+    def advance(self, frame_dt):
+        """Run the fixed TICK_DT updates owed for frame_dt seconds of frame time
+        and return how many ran. A slow frame is caught up with several ticks
+        before the next draw (frame skipping); beyond MAX_TICKS_PER_FRAME the
+        remaining backlog's updates are dropped rather than letting the game
+        spiral. A VirtualClock is advanced per tick, dropped ones included, so
+        game time always follows frame time to within one tick."""
+        self._accum += frame_dt
+        advance_clock = getattr(self.clock, "advance", None)
+        idle = self.idle()
+        n = 0
+        while self._accum >= TICK_DT:
+            if idle and self._accum >= 2 * TICK_DT:
+                # Updates would be no-ops until input arrives: only game time passes
+                if advance_clock:
+                    advance_clock(TICK_DT)
+                self._accum -= TICK_DT
+                self.ticks += 1
+                continue
+            if n == MAX_TICKS_PER_FRAME:
+                # Skip the updates, but let the game time they cover pass
+                dropped = int(self._accum / TICK_DT)
+                self.stats.record("ticks_dropped", dropped)
+                if advance_clock:
+                    advance_clock(dropped * TICK_DT)
+                self._accum -= dropped * TICK_DT
+                self.ticks += dropped
+                break
+            if advance_clock:
+                advance_clock(TICK_DT)
+            self.update(TICK_DT)
+            self._accum -= TICK_DT
+            self.ticks += 1
+            n += 1
+        self.stats.count("ticks", n)
+        # Fraction of a tick since the last update, for interpolating in draw()
+        self.alpha = self._accum / TICK_DT
+        return n
 
     def update(self, dt):
-        self.current.update(dt)
+        # Finish sprites decoded in the background (convert_alpha needs the main thread)
+        if SPRITES.pump():
+            self.invalidate()
+        with self.stats.timer(self.current_name, "update"):
+            self.current.update(dt)
 
     def draw(self):
-        self.current.draw(self.screen)
+        """Redraw what changed since the last draw. Returns the screen rects to
+        pass to pygame.display.update (empty when nothing changed)."""
+        if not self.dirty:
+            self.stats.end_frame()
+            return []
+        screen = self._counting_screen
+        with self.stats.timer(self.current_name, "draw"):
+            if self._full_redraw or self.show_stats:
+                self.current.draw(screen)
+                rects = [self.screen.get_rect()]
+            else:
+                rects = self._dirty_rects
+                # States can repaint a region themselves; otherwise redraw clipped to it
+                draw_partial = getattr(self.current, "draw_partial", None)
+                if not (draw_partial and draw_partial(screen, rects)):
+                    self.screen.set_clip(rects[0].unionall(rects[1:]))
+                    self.current.draw(screen)
+                    self.screen.set_clip(None)
+        if self.show_stats:
+            self._draw_stats_overlay()
+        self._full_redraw = False
+        self._dirty_rects = []
+        self.stats.end_frame()
+        return rects
+
+    def _draw_stats_overlay(self):
+        font = get_font(18)
+        lines = self.stats.overlay_lines()
+        w = max(render_text(font, line, (255, 255, 255)).get_width() for line in lines) + 12
+        h = len(lines) * 16 + 8
+        panel = pygame.Surface((w, h), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        x = self.screen.get_width() - w - 4
+        self.screen.blit(panel, (x, 4))
+        for i, line in enumerate(lines):
+            self.screen.blit(render_text(font, line, (200, 255, 200)), (x + 6, 8 + i * 16))
+
+    def shutdown(self):
+        if self.autosaver:
+            self.autosaver.close()
+        if self.stats_path:
+            self.stats.export(self.stats_path)
@@ -1,4 +1,6 @@
 import random
+from array import array
+import numpy as np
 
 class Ability:
     def __init__(self, name, power, target="enemy", heal=False):
@@ -20,23 +22,132 @@ LEARN_SET = [
     (4, Ability("Greater Heal", power=22, target="ally", heal=True)),
 ]
 
-def hp_by_elapsed_minutes(base, minutes):
+def hp_by_elapsed_minutes(base, minutes, rng=random):
     # Scale HP as time passes to reflect difficulty curve.
     # e.g., +5 HP per minute, +/- small randomness
-    return int(base + minutes * 5 + random.randint(-3, 3))
+    return int(base + minutes * 5 + rng.randint(-3, 3))
+
+DEFAULT_SPEED = 10  # battle speed; see scheduler.TurnScheduler
+
+class CombatantStore:
+    """Column storage for a group of combatants (a party, an enemy wave).
+
+    hp, max_hp, level and speed live in typed arrays and the alive flag in a
+    bytearray, indexed by each member's slot. The set of living members is
+    kept up to date as hp changes, so counting them is O(1) and the ordered
+    alive tuple is only rebuilt after someone dies or revives.
+    """
+    __slots__ = ("hp", "max_hp", "level", "speed", "alive", "members", "_living", "_alive_cache")
+
+    def __init__(self, combatants=()):
+        self.hp = array("i")
+        self.max_hp = array("i")
+        self.level = array("i")
+        self.speed = array("i")
+        self.alive = bytearray()
+        self.members = []      # slot -> combatant
+        self._living = {}      # slot -> combatant, for living members only
+        self._alive_cache = ()
+        for c in combatants:
+            self.adopt(c)
+
+    @classmethod
+    def of(cls, combatants):
+        """The store already holding exactly these combatants, or a new one adopting them."""
+        combatants = list(combatants)
+        store = combatants[0]._store if combatants else None
+        if store is not None and store.members == combatants:
+            return store
+        return cls(combatants)
+
+    def __len__(self):
+        return len(self.members)
+
+    def adopt(self, c, stats=None):
+        """Move a combatant's columns into this store; stats=(hp, max_hp, level, speed)
+        for one that has none yet."""
+        old = c._store
+        if old is self:
+            return
+        if old is None:
+            hp, max_hp, level, speed = stats
+        else:
+            hp, max_hp, level, speed = c.hp, c.max_hp, c.level, c.speed
+            old._set_alive(c._slot, False)
+        slot = len(self.members)
+        self.members.append(c)
+        self.hp.append(hp)
+        self.max_hp.append(max_hp)
+        self.level.append(level)
+        self.speed.append(speed)
+        self.alive.append(0)
+        c._store, c._slot = self, slot
+        self._set_alive(slot, hp > 0)
+
+    def set_hp(self, slot, value):
+        self.hp[slot] = value
+        if (value > 0) != self.alive[slot]:
+            self._set_alive(slot, value > 0)
+
+    def _set_alive(self, slot, alive):
+        self.alive[slot] = alive
+        if alive:
+            self._living[slot] = self.members[slot]
+        else:
+            self._living.pop(slot, None)
+        self._alive_cache = None
+
+    @property
+    def alive_count(self):
+        return len(self._living)
+
+    def alive_members(self):
+        """Living members in slot order, as a shared read-only tuple."""
+        if self._alive_cache is None:
+            self._alive_cache = tuple(self._living[s] for s in sorted(self._living))
+        return self._alive_cache
+
+    def weakest(self):
+        """Living member with the lowest hp (first by slot on ties), or None."""
+        if not self._living:
+            return None
+        if len(self._living) > 32:
+            # Large waves: argmin over zero-copy views of the columns
+            hp = np.frombuffer(self.hp, dtype=np.int32)
+            alive = np.frombuffer(self.alive, dtype=np.uint8)
+            return self.members[int(np.argmin(np.where(alive, hp, np.iinfo(np.int32).max)))]
+        hp = self.hp
+        best = None
+        for slot in self._living:
+            if best is None or hp[slot] < hp[best] or (hp[slot] == hp[best] and slot < best):
+                best = slot
+        return self.members[best] if best is not None else None
+
 
 class Combatant:
-    def __init__(self, name, level, max_hp, abilities=None, is_player=False):
+    __slots__ = ("name", "abilities", "is_player", "sprite", "_store", "_slot")
+
+    def __init__(self, name, level, max_hp, abilities=None, is_player=False, store=None, speed=DEFAULT_SPEED):
         self.name = name
-        self.level = level
-        self.max_hp = max_hp
-        self.hp = max_hp
         self.abilities = abilities[:] if abilities else []
         self.is_player = is_player
+        self.sprite = None
+        self._store = None
+        # Stats live in a CombatantStore: the given one (e.g. the enemy wave) or a private one
+        (store if store is not None else CombatantStore()).adopt(self, (max_hp, max_hp, level, speed))
+
+    hp = property(lambda self: self._store.hp[self._slot],
+                  lambda self, value: self._store.set_hp(self._slot, value))
+    max_hp = property(lambda self: self._store.max_hp[self._slot],
+                      lambda self, value: self._store.max_hp.__setitem__(self._slot, value))
+    level = property(lambda self: self._store.level[self._slot],
+                     lambda self, value: self._store.level.__setitem__(self._slot, value))
+    speed = property(lambda self: self._store.speed[self._slot],
+                     lambda self, value: self._store.speed.__setitem__(self._slot, value))
 
     @property
     def alive(self):
-        return self.hp > 0
+        return bool(self._store.alive[self._slot])
 
     def take_damage(self, amount):
         self.hp = max(0, self.hp - amount)
@@ -45,8 +156,10 @@ class Combatant:
         self.hp = min(self.max_hp, self.hp + amount)
 
 class Character(Combatant):
-    def __init__(self, name, level=1, max_hp=60, abilities=None):
-        super().__init__(name, level, max_hp, abilities or BASIC_ABILITIES[:2], is_player=True)
+    __slots__ = ("xp",)
+
+    def __init__(self, name, level=1, max_hp=60, abilities=None, store=None, speed=DEFAULT_SPEED):
+        super().__init__(name, level, max_hp, abilities or BASIC_ABILITIES[:2], is_player=True, store=store, speed=speed)
         self.xp = 0
 
     def xp_to_next(self):
@@ -69,24 +182,26 @@ class Character(Combatant):
         return leveled
 
 class Monster(Combatant):
-    pass
+    __slots__ = ()
 
 class Party:
     def __init__(self, members=None, max_size=4):
         self.members = members[:] if members else []
         self.max_size = max_size
+        self.store = CombatantStore(self.members)
 
     def alive_members(self):
-        return [m for m in self.members if m.alive]
+        return self.store.alive_members()
 
     def add(self, char):
         if len(self.members) < self.max_size:
             self.members.append(char)
+            self.store.adopt(char)
             return True
         return False
 
     def is_wiped(self):
-        return len(self.alive_members()) == 0
+        return self.store.alive_count == 0
 
 # Simple name pools
 NPC_NAMES = [
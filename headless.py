@@ -0,0 +1,80 @@
+"""Headless, uncapped game loop for soak and performance runs.
+
+Uses SDL's dummy video driver, no frame cap and a VirtualClock advanced by
+the game's fixed logic ticks, so elapsed_minutes (and everything scaled by it)
+follows simulated time however fast the loop actually runs. Each loop
+iteration is one frame of dt seconds (one tick at the default dt); a dt of
+more than MAX_TICKS_PER_FRAME ticks still moves game time by dt, with the
+updates past that cap skipped as on a slow frame.
+
+    python headless.py --ticks 100000 --no-draw --stats soak.json
+"""
+import argparse
+import os
+import random
+import time
+
+
+def random_input_bot(seed=0, every=3):
+    """Input source pressing plausible keys: movement, advance, abilities, interact."""
+    import pygame
+    keys = [pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT,
+            pygame.K_SPACE, pygame.K_RETURN, pygame.K_1, pygame.K_2, pygame.K_e]
+    rng = random.Random(seed)
+
+    def source(game, tick):
+        if tick % every:
+            return []
+        return [pygame.event.Event(pygame.KEYDOWN, key=rng.choice(keys), mod=0, unicode="", scancode=0)]
+    return source
+
+
+def run_headless(ticks, dt=1.0 / 60, input_source=None, draw=True, stats_path=None, size=None, seed=0):
+    """Run the game for `ticks` loop iterations as fast as possible.
+    input_source(game, tick) returns the events to feed on each tick.
+    Returns (game, wall_seconds)."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from engine import VirtualClock
+    from main import create_game, WIDTH, HEIGHT
+
+    pygame.init()
+    screen = pygame.display.set_mode(size or (WIDTH, HEIGHT))
+    clock = VirtualClock()
+    game = create_game(screen, clock=clock, stats_path=stats_path, seed=seed)
+    t0 = time.perf_counter()
+    for tick in range(ticks):
+        if not game.running:
+            break
+        if input_source:
+            for event in input_source(game, tick):
+                game.handle_event(event)
+        pygame.event.pump()
+        game.advance(dt)
+        if draw:
+            game.draw()
+    wall = time.perf_counter() - t0
+    game.shutdown()
+    return game, wall
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the game headless without a frame cap")
+    ap.add_argument("--ticks", type=int, default=10000)
+    ap.add_argument("--dt", type=float, default=1.0 / 60, help="simulated seconds per frame; game time always advances by exactly "
+                    "this much, but ticks past engine.MAX_TICKS_PER_FRAME skip their updates")
+    ap.add_argument("--seed", type=int, default=0, help="input bot seed")
+    ap.add_argument("--no-draw", action="store_true", help="skip rendering entirely")
+    ap.add_argument("--stats", help="export instrumentation to this .json/.csv path")
+    args = ap.parse_args(argv)
+
+    game, wall = run_headless(args.ticks, args.dt, random_input_bot(args.seed),
+                              draw=not args.no_draw, stats_path=args.stats)
+    simulated = args.ticks * args.dt
+    print(f"{args.ticks} ticks in {wall:.2f}s ({args.ticks / wall:,.0f} ticks/s), "
+          f"{simulated / 60:.1f} simulated minutes, final state: {game.current_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Frame-time instrumentation used by engine.Game.
+
+Every state gets per-phase (event/update/draw) timings, rolling p50/p95/p99
+histograms and per-frame draw-call/blit counters without any code of its own:
+the engine wraps the calls it makes into the current state. Draw calls are
+counted by wrapping pygame.draw; blits by handing states a counting proxy for
+the screen.
+"""
+import csv
+import json
+import time
+from collections import deque, defaultdict
+from contextlib import contextmanager
+import pygame
+
+
+class RollingHistogram:
+    """Last `size` samples plus lifetime count/total/max."""
+
+    def __init__(self, size=600):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentiles(self, *ps):
+        if not self.samples:
+            return tuple(0.0 for _ in ps)
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, int(round(p / 100.0 * last)))] for p in ps)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class FrameStats:
+    """Per-state phase timings (ms) and per-frame counters."""
+
+    def __init__(self, window=600):
+        self.window = window
+        self.timings = defaultdict(lambda: RollingHistogram(window))  # (state, phase) -> hist
+        self.counters = defaultdict(lambda: RollingHistogram(window))  # name -> per-frame values
+        self.totals = defaultdict(float)  # name -> lifetime sum of counters and events
+        self.frame_ms = RollingHistogram(window)
+        self._frame_counts = defaultdict(int)
+        self._last_frame = None
+
+    @contextmanager
+    def timer(self, state, phase):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[(state, phase)].add((time.perf_counter() - t0) * 1000.0)
+
+    def count(self, name, n=1):
+        self._frame_counts[name] += n
+
+    def record(self, name, value):
+        """Record a one-off measurement (e.g. an autosave's ms or bytes)."""
+        self.counters[name].add(value)
+        self.totals[name] += value
+
+    def pause(self):
+        """Don't count the time until the next end_frame as a frame (the loop
+        slept waiting for input)."""
+        self._last_frame = None
+
+    def end_frame(self):
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self.frame_ms.add((now - self._last_frame) * 1000.0)
+        self._last_frame = now
+        for name in ("draw_calls", "blits"):
+            self._frame_counts.setdefault(name, 0)
+        for name, n in self._frame_counts.items():
+            self.counters[name].add(n)
+            self.totals[name] += n
+        self._frame_counts.clear()
+
+    def rows(self):
+        out = []
+        for (state, phase), hist in sorted(self.timings.items()):
+            p50, p95, p99 = hist.percentiles(50, 95, 99)
+            out.append({"state": state, "phase": phase, "count": hist.count, "mean_ms": hist.mean(),
+                        "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": hist.max})
+        return out
+
+    def summary(self):
+        p50, p95, p99 = self.frame_ms.percentiles(50, 95, 99)
+        counters = {}
+        for name, hist in sorted(self.counters.items()):
+            c50, c95, c99 = hist.percentiles(50, 95, 99)
+            counters[name] = {"last": hist.samples[-1] if hist.samples else 0, "p50": c50, "p95": c95,
+                              "p99": c99, "max": hist.max, "total": self.totals[name]}
+        return {
+            "frames": self.frame_ms.count,
+            "frame_ms": {"mean": self.frame_ms.mean(), "p50": p50, "p95": p95, "p99": p99, "max": self.frame_ms.max},
+            "phases": self.rows(),
+            "counters": counters,
+        }
+
+    def export(self, path):
+        """Write the summary as JSON, or the phase table as CSV if path ends in .csv."""
+        if path.endswith(".csv"):
+            rows = self.rows()
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["state", "phase", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as f:
+                json.dump(self.summary(), f, indent=2)
+
+    def overlay_lines(self):
+        p50, p95, p99 = self.frame_ms.percentiles(50, 95, 99)
+        fps = 1000.0 / p50 if p50 else 0.0
+        lines = [f"frame {p50:.1f}/{p95:.1f}/{p99:.1f} ms (p50/p95/p99)  ~{fps:.0f} fps"]
+        for row in self.rows():
+            lines.append(f"{row['state']}.{row['phase']}: {row['p50_ms']:.2f}/{row['p95_ms']:.2f}/{row['p99_ms']:.2f} ms")
+        for name, hist in sorted(self.counters.items()):
+            last = hist.samples[-1] if hist.samples else 0
+            lines.append(f"{name}: {last:g} (max {hist.max:g})")
+        return lines
+
+
+# ----- Draw-call and blit counting -----
+_DRAW_FUNCS = ("rect", "line", "lines", "aaline", "aalines", "circle", "ellipse", "arc", "polygon")
+_active_stats = None
+
+
+class CountingSurface:
+    """Screen proxy handed to states while instrumented: counts blits and
+    forwards everything else to the real surface."""
+
+    def __init__(self, surface, stats):
+        self._surface = surface
+        self._stats = stats
+
+    def blit(self, *args, **kwargs):
+        self._stats.count("blits")
+        return self._surface.blit(*args, **kwargs)
+
+    def blits(self, blit_sequence, *args, **kwargs):
+        blit_sequence = list(blit_sequence)
+        self._stats.count("blits", len(blit_sequence))
+        return self._surface.blits(blit_sequence, *args, **kwargs)
+
+    def fill(self, *args, **kwargs):
+        self._stats.count("draw_calls")
+        return self._surface.fill(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._surface, name)
+
+
+def _unwrap(surface):
+    return surface._surface if isinstance(surface, CountingSurface) else surface
+
+
+def _wrap_draw(fn):
+    def counted(surface, *args, **kwargs):
+        if _active_stats is not None:
+            _active_stats.count("draw_calls")
+        return fn(_unwrap(surface), *args, **kwargs)
+    counted.__wrapped__ = fn
+    counted.__name__ = fn.__name__
+    counted.__doc__ = fn.__doc__
+    return counted
+
+
+def install_draw_counters(stats):
+    """Route pygame.draw calls through counting wrappers reporting to stats."""
+    global _active_stats
+    _active_stats = stats
+    for name in _DRAW_FUNCS:
+        fn = getattr(pygame.draw, name, None)
+        if fn is not None and not hasattr(fn, "__wrapped__"):
+            setattr(pygame.draw, name, _wrap_draw(fn))
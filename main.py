@@ -1,13 +1,17 @@
-import pygame, sys
-from engine import Game
+import pygame, sys, os
+from engine import Game, VirtualClock, IDLE_WAIT_MS
 from overworld import Overworld
 from battle import Battle
 from menu import MainMenu
+from utils.assets import SPRITES, ATLAS_CATEGORIES
 
 WIDTH, HEIGHT = 800, 600
 FPS = 60
 
 def switch_to_overworld(game, ow):
+    # Returning from a won battle is a natural autosave point
+    if game.autosaver:
+        game.autosaver.request()
     game.set_state("overworld", overworld=ow)
 
 def boot_new_game(game):
@@ -15,6 +19,19 @@ def boot_new_game(game):
     ow = Overworld(game)
     game.set_state("overworld", overworld=ow)
 
+def continue_game(game):
+    # Resume from the newest save slot that loads (memory-mapped, no world
+    # regeneration); False if none does
+    from savegame import load_game, save_slots, LOAD_ERRORS
+    for path in save_slots():
+        try:
+            ow = load_game(game, path)
+        except LOAD_ERRORS:
+            continue
+        game.set_state("overworld", overworld=ow)
+        return True
+    return False
+
 def back_to_menu(game):
     game.set_state("menu")
 
@@ -41,14 +58,26 @@ class OverworldState:
     def draw(self, screen):
         self.ow.draw(screen)
 
+    def idle(self):
+        return self.ow.idle()
+
+    def draw_partial(self, screen, rects):
+        return self.ow.draw_partial(screen, rects)
+
 class BattleState:
     def __init__(self, game):
         self.game = game
         self.battle = None
 
+    def prewarm(self):
+        # One Battle scene is built up front and reset for every encounter
+        if self.battle is None:
+            self.battle = Battle(self.game)
+
     def enter(self, **kwargs):
-        # kwargs: overworld, party
-        self.battle = Battle(self.game, kwargs["overworld"], kwargs["party"], kwargs.get("biome"))
+        # kwargs: overworld, party, biome, enemies (pre-rolled, optional)
+        self.prewarm()
+        self.battle.reset(kwargs["overworld"], kwargs["party"], kwargs.get("biome"), kwargs.get("enemies"))
 
     def exit(self):
         pass
@@ -62,12 +91,15 @@ class BattleState:
     def draw(self, screen):
         self.battle.draw(screen)
 
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("JRPG Starter")
-    clock = pygame.time.Clock()
+    def idle(self):
+        return self.battle.idle()
+
+    def draw_partial(self, screen, rects):
+        return self.battle.draw_partial(screen, rects)
 
+def create_game(screen, clock=None, stats_path=None, seed=None, autosave=False):
+    # Sprite categories are served from packed atlases (cached on disk)
+    SPRITES.use_atlases(ATLAS_CATEGORIES)
     states = {
         "menu": MainMenu(None),
         "overworld": OverworldState(None),
@@ -76,23 +108,63 @@ def main():
     # Construct the game without immediately entering a state. We inject the
     # game reference into each state first, then switch to the desired start
     # state. This ensures the overworld is created with a valid game object.
-    game = Game(screen, states)
+    game = Game(screen, states, stats_path=stats_path, clock=clock, seed=seed)
     states["menu"].game = game
     states["overworld"].game = game
     states["battle"].game = game
+    states["battle"].prewarm()
+    if autosave:
+        from autosave import Autosaver
+        game.autosaver = Autosaver(game)
 
     # Start at main menu
     game.set_state("menu")
+    return game
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("JRPG Starter")
+    clock = pygame.time.Clock()
+    # Game time advances one fixed tick at a time, so a recorded session replays identically
+    frame_clock = VirtualClock()
+
+    # JRPG_STATS=path.json|path.csv exports frame-time instrumentation on exit
+    # JRPG_SEED fixes the RNG streams; JRPG_RECORD=path.json records the session
+    seed = os.environ.get("JRPG_SEED")
+    game = create_game(screen, clock=frame_clock, stats_path=os.environ.get("JRPG_STATS"),
+                       seed=int(seed) if seed else None, autosave=True)
+    record_path = os.environ.get("JRPG_RECORD")
+    recorder = None
+    if record_path:
+        from replay import InputRecorder
+        recorder = InputRecorder(game)
 
     while game.running:
+        if game.can_sleep():
+            # Static screen: block until input arrives instead of redrawing at FPS
+            event = pygame.event.wait(IDLE_WAIT_MS)
+            events = ([] if event.type == pygame.NOEVENT else [event]) + pygame.event.get()
+            game.stats.pause()
+        else:
+            events = pygame.event.get()
         dt = clock.tick(FPS) / 1000.0
-        for event in pygame.event.get():
+        if recorder:
+            recorder.begin_frame(dt)
+        for event in events:
+            if recorder:
+                recorder.record(event)
             game.handle_event(event)
 
-        game.update(dt)
-        game.draw()
-        pygame.display.flip()
+        # Logic in fixed ticks (as many as this frame owes), then redraw only what changed
+        game.advance(dt)
+        rects = game.draw()
+        if rects:
+            pygame.display.update(rects)
 
+    game.shutdown()
+    if recorder:
+        recorder.save(record_path)
     pygame.quit()
     sys.exit()
 
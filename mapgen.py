@@ -1,4 +1,7 @@
 import random
+from bisect import bisect_left
+from itertools import accumulate
+import numpy as np
 
 BIOMES = [
     ("plains", 0.25),
@@ -26,35 +29,215 @@ BIOME_COLORS = {
     "dungeon": (130, 60, 160),
 }
 
-def weighted_choice(weights):
-    r = random.random() * sum(w for _, w in weights)
-    upto = 0
-    for item, w in weights:
-        if upto + w >= r:
-            return item
-        upto += w
-    assert False
+# Biome lookup table for the compact grid: tile value -> biome name
+BIOME_NAMES = [name for name, _ in BIOMES]
+BIOME_IDS = {name: i for i, name in enumerate(BIOME_NAMES)}
+_BIOME_P = np.array([w for _, w in BIOMES], dtype=np.float64)
+_BIOME_P /= _BIOME_P.sum()
 
-def generate_map(width, height, seed=None):
-    rnd = random.Random(seed)
-    grid = [[None for _ in range(width)] for _ in range(height)]
-
-    # Simple region seeding for smoother patches
-    for y in range(height):
-        for x in range(width):
-            if x % 6 == 0 and y % 6 == 0:
-                base = weighted_choice(BIOMES)
-                for dy in range(6):
-                    for dx in range(6):
-                        if 0 <= y+dy < height and 0 <= x+dx < width:
-                            if rnd.random() < 0.85:
-                                grid[y+dy][x+dx] = base
-                            else:
-                                grid[y+dy][x+dx] = weighted_choice(BIOMES)
+REGION = 6  # side of the square patches seeded with a single biome
+
+def weighted_choice(weights, rng=random):
+    cum = list(accumulate(w for _, w in weights))
+    r = rng.random() * cum[-1]
+    return weights[min(bisect_left(cum, r), len(weights) - 1)][0]
+
+
+class MapRow:
+    """Row view so MapGrid keeps supporting grid[y][x] reads and writes."""
+    __slots__ = ("grid", "y")
+
+    def __init__(self, grid, y):
+        self.grid = grid
+        self.y = y
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, x):
+        return BIOME_NAMES[self.grid.ids.item(self.y, x)]
+
+    def __setitem__(self, x, biome):
+        self.grid.set_tile(x, self.y, biome)
+
+    def __iter__(self):
+        return (BIOME_NAMES[i] for i in self.grid.ids[self.y].tolist())
+
+
+def sample_coords(xs, ys, count, rng, center=None, min_dist=0):
+    """Pick up to count distinct (x, y) pairs from coordinate arrays using rng
+    (a random.Random-like object), optionally at least min_dist from center."""
+    if center is not None and min_dist > 0:
+        keep = np.abs(xs - center[0]) + np.abs(ys - center[1]) >= min_dist
+        xs, ys = xs[keep], ys[keep]
+    picks = rng.sample(range(len(xs)), min(count, len(xs)))
+    return [(int(xs[i]), int(ys[i])) for i in picks]
+
+
+class BiomeIndex:
+    """Per-biome tile index over a (height, width) biome id array.
+
+    Holds the coordinate list of every biome and, built on first use, a
+    nearest-tile field per biome: for each cell, the flat index of the closest
+    tile of that biome by Manhattan distance. Nearest queries are then a single
+    array lookup. Call update() whenever a tile changes.
+    """
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.height, self.width = ids.shape
+        self._coords = {}   # biome id -> flat indices, row-major
+        self._nearest = {}  # biome id -> int32 (H, W) flat index of nearest tile, -1 if none
+        self.field_builds = 0
+
+    def coords(self, biome_id):
+        flat = self._coords.get(biome_id)
+        if flat is None:
+            flat = np.flatnonzero(self.ids == biome_id).astype(np.int32)
+            self._coords[biome_id] = flat
+        return flat
+
+    def count(self, biome_id):
+        return len(self.coords(biome_id))
+
+    def _build_field(self, biome_id):
+        # Multi-source BFS over an open 4-connected grid reduces to Manhattan
+        # distance, which separates into a sweep along x then along y. Each
+        # sweep runs forwards and backwards, vectorized across the other axis.
+        H, W = self.height, self.width
+        src = self.ids == biome_id
+        dist = np.where(src, 0, H + W + 1).astype(np.int32)
+        near = np.where(src, np.arange(H * W, dtype=np.int32).reshape(H, W), -1).astype(np.int32)
+        for d, n in ((dist.T, near.T), (dist, near)):
+            for order in (range(1, len(d)), range(len(d) - 2, -1, -1)):
+                step = order.step
+                for i in order:
+                    cand = d[i - step] + 1
+                    better = cand < d[i]
+                    if better.any():
+                        d[i][better] = cand[better]
+                        n[i][better] = n[i - step][better]
+        self._nearest[biome_id] = near
+        self.field_builds += 1
+        return near
+
+    def nearest(self, x, y, biome_id):
+        """(x, y) of the closest tile of biome_id, or None if there is none."""
+        near = self._nearest.get(biome_id)
+        if near is None:
+            if self.count(biome_id) == 0:
+                return None
+            near = self._build_field(biome_id)
+        flat = near.item(y, x)
+        if flat < 0:
+            return None
+        return (flat % self.width, flat // self.width)
+
+    def update(self, x, y, old_id, new_id):
+        """Refresh the index after tile (x, y) changed from old_id to new_id."""
+        if old_id == new_id:
+            return
+        self._coords.pop(old_id, None)
+        self._coords.pop(new_id, None)
+        # A removed source can't be patched locally; rebuild that field on demand
+        self._nearest.pop(old_id, None)
+        near = self._nearest.get(new_id)
+        if near is not None:
+            # The new tile becomes the nearest source wherever it is strictly closer
+            ys, xs = np.indices(near.shape)
+            cur_d = np.abs(near % self.width - xs) + np.abs(near // self.width - ys)
+            near[np.abs(xs - x) + np.abs(ys - y) < cur_d] = y * self.width + x
 
+    def sample(self, biome_ids, count, rng, center=None, min_dist=0):
+        flat = np.concatenate([self.coords(b) for b in biome_ids])
+        return sample_coords(flat % self.width, flat // self.width, count, rng, center, min_dist)
+
+
+class MapGrid:
+    """Biome map stored as a (height, width) uint8 array of BIOME_NAMES indices."""
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.height, self.width = ids.shape
+        self._index = None
+        self.mapped_path = None  # save file ids is mapped from (savegame.load_game)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = BiomeIndex(self.ids)
+        return self._index
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.height:
+            raise IndexError(y)
+        return MapRow(self, y)
+
+    def __iter__(self):
+        return (MapRow(self, y) for y in range(self.height))
+
+    def detach(self):
+        """Copy the tiles out of the buffer they view (a save file mapping),
+        so the file can be replaced."""
+        if self.ids.base is not None:
+            self.ids = self.ids.copy()
+            if self._index is not None:
+                self._index.ids = self.ids
+
+    def tile(self, x, y):
+        return BIOME_NAMES[self.ids.item(y, x)]
+
+    def set_tile(self, x, y, biome):
+        old_id, new_id = self.ids.item(y, x), BIOME_IDS[biome]
+        self.ids[y, x] = new_id
+        if self._index is not None:
+            self._index.update(x, y, old_id, new_id)
+
+    def to_lists(self):
+        names = np.array(BIOME_NAMES, dtype=object)
+        return names[self.ids].tolist()
+
+    # World interface shared with world.ChunkedWorld
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def clamp(self, x, y):
+        return max(0, min(self.width - 1, x)), max(0, min(self.height - 1, y))
+
+    def prefetch(self, x, y):
+        pass
+
+    def nearest_tile_of_type(self, start, biome):
+        """Closest (x, y) of the given biome by Manhattan distance; the map center if there is none."""
+        pos = self.index.nearest(start[0], start[1], BIOME_IDS[biome])
+        return pos if pos is not None else (self.width // 2, self.height // 2)
+
+    def sample_tiles(self, biomes, count, rng, center=None, min_dist=0):
+        """Up to count distinct tiles of the given biomes, sampled directly from the index."""
+        return self.index.sample([BIOME_IDS[b] for b in biomes], count, rng, center, min_dist)
+
+
+def _generate_ids(width, height, rng):
+    n = len(BIOME_NAMES)
+    # Simple region seeding for smoother patches: one biome per REGION x REGION
+    # block, with ~15% of tiles re-rolled independently
+    base = rng.choice(n, size=(-(-height // REGION), -(-width // REGION)), p=_BIOME_P).astype(np.uint8)
+    ids = np.repeat(np.repeat(base, REGION, axis=0), REGION, axis=1)
+    ids = np.ascontiguousarray(ids[:height, :width])
+    scatter = rng.random((height, width)) >= 0.85
+    ids[scatter] = rng.choice(n, size=int(np.count_nonzero(scatter)), p=_BIOME_P)
+    return ids
+
+def generate_ids(width, height, rng):
+    """Biome id array for a width x height area, drawing only from rng."""
+    ids = _generate_ids(width, height, rng)
     # Guarantee at least one town and one dungeon
-    grid[rnd.randrange(height)][rnd.randrange(width)] = "town"
-    grid[rnd.randrange(height)][rnd.randrange(width)] = "dungeon"
-    grid[rnd.randrange(height)][rnd.randrange(width)] = "city"
+    for biome in ("town", "dungeon", "city"):
+        ids[rng.integers(height), rng.integers(width)] = BIOME_IDS[biome]
+    return ids
 
-    return grid
+def generate_map(width, height, seed=None):
+    return MapGrid(generate_ids(width, height, np.random.default_rng(seed)))
@@ -1,19 +1,24 @@
 import pygame
 from utils.assets import load_sprite_for, scale_to_fit
+from utils.fonts import get_font, render_text
+from savegame import save_exists
 
 
 class MainMenu:
     def __init__(self, game):
         self.game = game
-        self.title_font = pygame.font.SysFont(None, 64)
-        self.button_font = pygame.font.SysFont(None, 36)
-        self.tip_font = pygame.font.SysFont(None, 22)
+        self.title_font = get_font(64)
+        self.button_font = get_font(36)
+        self.tip_font = get_font(22)
         # Background image expected at assets/ui/menu_bg.png
         self.bg = load_sprite_for("ui", "menu_bg")
         self.button_rect = None
+        self.can_continue = save_exists()
+        self.message = None  # e.g. why Continue went away
+        self._gradient = None  # fallback background, rendered once per screen size
 
     def enter(self, **kwargs):
-        pass
+        self.can_continue = save_exists()
 
     def exit(self):
         pass
@@ -22,6 +27,11 @@ class MainMenu:
         if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_SPACE):
             from main import boot_new_game
             boot_new_game(self.game)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_c and self.can_continue:
+            from main import continue_game
+            if not continue_game(self.game):
+                self.can_continue = False
+                self.message = "The saved game could not be loaded."
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if self.button_rect and self.button_rect.collidepoint(event.pos):
                 from main import boot_new_game
@@ -30,6 +40,18 @@ class MainMenu:
     def update(self, dt):
         pass
 
+    def idle(self):
+        return True
+
+    def _background(self, size):
+        if self._gradient is None or self._gradient.get_size() != size:
+            w, h = size
+            self._gradient = pygame.Surface(size).convert()
+            for i in range(h):
+                c = 90 + int(60 * i / max(1, h))
+                pygame.draw.line(self._gradient, (c, c, c), (0, i), (w, i))
+        return self._gradient
+
     def draw(self, screen):
         # Draw background image or gradient fallback
         if self.bg:
@@ -39,13 +61,10 @@ class MainMenu:
             y = (screen.get_height() - bg_scaled.get_height()) // 2
             screen.blit(bg_scaled, (x, y))
         else:
-            screen.fill((30, 60, 90))
-            for i in range(screen.get_height()):
-                c = 90 + int(60 * i / max(1, screen.get_height()))
-                pygame.draw.line(screen, (c, c, c), (0, i), (screen.get_width(), i))
+            screen.blit(self._background(screen.get_size()), (0, 0))
 
         # Title
-        title = self.title_font.render("Cursor RPG", True, (255, 255, 255))
+        title = render_text(self.title_font, "Cursor RPG", (255, 255, 255))
         title_rect = title.get_rect(center=(screen.get_width() // 2, screen.get_height() // 3))
         screen.blit(title, title_rect)
 
@@ -56,12 +75,18 @@ class MainMenu:
         self.button_rect = pygame.Rect(btn_x, btn_y, btn_w, btn_h)
         pygame.draw.rect(screen, (20, 20, 30), self.button_rect)
         pygame.draw.rect(screen, (255, 255, 255), self.button_rect, 2)
-        label = self.button_font.render("New Game (Enter)", True, (240, 240, 240))
+        label = render_text(self.button_font, "New Game (Enter)", (240, 240, 240))
         lr = label.get_rect(center=self.button_rect.center)
         screen.blit(label, lr)
+        if self.can_continue:
+            cont = render_text(self.tip_font, "Continue saved game (C)", (240, 240, 240))
+            screen.blit(cont, cont.get_rect(center=(self.button_rect.centerx, self.button_rect.bottom + 24)))
+        elif self.message:
+            msg = render_text(self.tip_font, self.message, (255, 200, 160))
+            screen.blit(msg, msg.get_rect(center=(self.button_rect.centerx, self.button_rect.bottom + 24)))
 
         # Tip text
-        tip = self.tip_font.render("Place a background at assets/ui/menu_bg.png", True, (220, 220, 220))
+        tip = render_text(self.tip_font, "Place a background at assets/ui/menu_bg.png", (220, 220, 220))
         screen.blit(tip, (10, screen.get_height() - tip.get_height() - 10))
 
 
@@ -1,53 +1,89 @@
-import pygame, random
+import pygame
 import os
-from utils.assets import load_sprite_for, scale_to_fit
+from utils.assets import load_sprite_for, preload_sprites, scale_to_fit
+from utils.fonts import get_font, render_text
+from utils.tilecache import ChunkSurfaceCache
+from utils.spatial import SpatialHash
 from dialogue import DialogueBox
-from mapgen import generate_map, BIOME_COLORS, SAFE_BIOMES
-from entities import Character, Party, NPC_NAMES, hp_by_elapsed_minutes
+from mapgen import BIOME_COLORS, SAFE_BIOMES
+from world import ChunkedWorld
+from worldcache import load_world, spawn_npcs
+from entities import Character, Party, hp_by_elapsed_minutes
 from quests import QuestManager
+from battle_core import encounter_chance, enemy_pool, spawn_enemies
 
 TILE = 24
 VIEW_W, VIEW_H = 32, 20  # in tiles
+CHUNK_TILES = 16  # tiles per side of a pre-rendered tile-layer chunk
 MAP_W, MAP_H = 64, 64
+STREAMING_WORLD = False  # True: unbounded ChunkedWorld instead of a MAP_W x MAP_H grid
+WORLD_SEED = 1337
+NPC_COUNT, QUEST_NODE_COUNT = 40, 8
+PREROLL_MAX_AGE = 1.0  # minutes before a pre-rolled encounter is re-rolled (HP scales with time)
 
 class Overworld:
-    def __init__(self, game):
+    def __init__(self, game, streaming=STREAMING_WORLD, world=None):
+        # world: an already built map (savegame.load_game); NPCs, quest nodes
+        # and party state are then restored by the caller instead of spawned
         self.game = game
-        self.map = generate_map(MAP_W, MAP_H, seed=1337)
-        self.player_pos = [MAP_W//2, MAP_H//2]
+        self.rng = game.rng("overworld")
+        spawns = None
+        if world is not None:
+            self.map = world
+            self.player_pos = [0, 0] if world.width is None else [world.width//2, world.height//2]
+        elif streaming:
+            # Chunks are generated around the camera on demand
+            self.map = ChunkedWorld(seed=WORLD_SEED)
+            self.player_pos = [0, 0]
+        else:
+            # Grid and spawn tables come from the on-disk world cache
+            self.map, npcs, nodes = load_world(WORLD_SEED, MAP_W, MAP_H, NPC_COUNT, QUEST_NODE_COUNT)
+            spawns = (npcs, nodes)
+            self.player_pos = [MAP_W//2, MAP_H//2]
+        self.map.prefetch(*self.player_pos)
         self.party = Party([Character("You", level=1, max_hp=60)], max_size=4)
 
         # Quests
         self.quests = QuestManager(self)
-        self.quest_nodes = self.quests.generate_world_nodes(self.map, count=8)
-
-        # NPCs spawn mostly in towns/cities
-        self.npcs = self._spawn_npcs(40)
-        self.font = pygame.font.SysFont(None, 22)
-        self.bigfont = pygame.font.SysFont(None, 28)
+        self.quest_nodes = []
+        self.npcs = []
+        if spawns:
+            self.npcs, self.quest_nodes = spawns
+            self.quests.side_nodes = self.quest_nodes
+        elif world is None:
+            self.quest_nodes = self.quests.generate_world_nodes(self.map, count=QUEST_NODE_COUNT)
+            self.npcs = spawn_npcs(self.map, NPC_COUNT, self.rng, self.player_pos)
+        self.index_entities()
+        # Biome layer is pre-rendered into chunk surfaces and blitted per frame
+        self.tile_cache = ChunkSurfaceCache(self._tile_at, BIOME_COLORS, TILE, chunk_tiles=CHUNK_TILES)
+        self.font = get_font(22)
+        self.bigfont = get_font(28)
         self.help = False
         self.dialogue = DialogueBox((self.game.screen.get_width(), self.game.screen.get_height()))
         self.shown_intro = False
         self.message = None
         self.message_timer = 0
 
-        # Load sprites
+        # Load sprites; battle sprites for the party and nearby enemies decode in the background
         self.player_sprite = load_sprite_for("characters", "player")
         self.npc_sprite = load_sprite_for("npcs", "default")
+        preload_sprites("characters", [m.name for m in self.party.members])
+        self._preloaded_biome = None
+        self._preload_biome(self._tile_at(*self.player_pos))
 
         self.steps_since_last_encounter = 0
         self.encounter_base = 0.05  # per step probability
+        self._next_encounter = None  # (biome, minutes, enemies) rolled ahead of time
 
-    def _spawn_npcs(self, count):
-        out = []
-        tries = 0
-        while len(out) < count and tries < 2000:
-            tries += 1
-            x = random.randrange(MAP_W)
-            y = random.randrange(MAP_H)
-            if self.map[y][x] in ("town", "city"):
-                out.append({"x": x, "y": y, "name": random.choice(NPC_NAMES)})
-        return out
+    def index_entities(self):
+        # Spatial indexes for adjacency checks and view culling; untaken nodes only
+        self.npc_index = SpatialHash()
+        for npc in self.npcs:
+            self.npc_index.insert(npc, npc["x"], npc["y"])
+        self.node_index = SpatialHash()
+        for qn in self.quest_nodes:
+            if not qn.get('taken'):
+                self.node_index.insert(qn, qn["x"], qn["y"])
 
     def enter(self):
         # Intro dialogue once at start
@@ -66,16 +102,23 @@ class Overworld:
         pass
 
     def _tile_at(self, x, y):
-        if 0 <= x < MAP_W and 0 <= y < MAP_H:
-            return self.map[y][x]
+        if self.map.in_bounds(x, y):
+            return self.map.tile(x, y)
         return "plains"
 
+    def set_tile(self, x, y, biome):
+        # Single entry point for map edits so the cached chunk gets rebuilt
+        if self.map.in_bounds(x, y):
+            self.map.set_tile(x, y, biome)
+            self.tile_cache.invalidate_tile(x, y)
+
     def _move_player(self, dx, dy):
-        nx = max(0, min(MAP_W-1, self.player_pos[0] + dx))
-        ny = max(0, min(MAP_H-1, self.player_pos[1] + dy))
+        nx, ny = self.map.clamp(self.player_pos[0] + dx, self.player_pos[1] + dy)
         if [nx, ny] != self.player_pos:
             self.player_pos = [nx, ny]
+            self.map.prefetch(nx, ny)
             biome = self._tile_at(nx, ny)
+            self._preload_biome(biome)
             # Main quest city trigger
             if biome == "city":
                 desc = self.quests.trigger_main_on_city_enter(nx, ny)
@@ -85,37 +128,56 @@ class Overworld:
             msgs = self.quests.on_enter_tile(nx, ny, biome)
             if msgs:
                 self.dialogue.open(msgs)
-            self._check_random_encounter()
+            if not self._check_random_encounter() and biome not in SAFE_BIOMES:
+                # Roll the next fight while walking so the battle transition is free
+                self._prepare_encounter(biome)
+
+    def _preload_biome(self, biome):
+        if biome != self._preloaded_biome:
+            self._preloaded_biome = biome
+            preload_sprites("enemies", [name for name, _ in enemy_pool(biome)])
 
     def _adjacent_npc(self):
-        for npc in self.npcs:
-            if abs(npc["x"] - self.player_pos[0]) + abs(npc["y"] - self.player_pos[1]) == 1:
-                return npc
-        return None
+        near = self.npc_index.adjacent(*self.player_pos)
+        return near[0] if near else None
 
-        
     def _adjacent_quest_node(self):
-        for qn in self.quest_nodes:
-            if qn.get('taken'):
-                continue
-            if abs(qn["x"] - self.player_pos[0]) + abs(qn["y"] - self.player_pos[1]) == 1:
-                return qn
-        return None
+        near = self.node_index.adjacent(*self.player_pos)
+        return near[0] if near else None
+
+    def _prepare_encounter(self, biome):
+        minutes = self.game.elapsed_minutes()
+        if self._preroll_matches(biome, minutes):
+            return
+        enemies = spawn_enemies(biome, minutes, self.game.rng("battle"))
+        for e in enemies:
+            e.sprite = load_sprite_for("enemies", e.name)
+        self._next_encounter = (biome, minutes, enemies)
+
+    def _preroll_matches(self, biome, minutes):
+        """True if the pre-rolled encounter is for this biome and was rolled
+        recently enough to still match hp_by_elapsed_minutes scaling."""
+        prepared = self._next_encounter
+        return bool(prepared) and prepared[0] == biome and minutes - prepared[1] < PREROLL_MAX_AGE
 
     def _check_random_encounter(self):
+        """Roll for a random encounter on this step; True if a battle started."""
         self.steps_since_last_encounter += 1
         biome = self._tile_at(*self.player_pos)
         if biome in SAFE_BIOMES:
-            return
+            return False
         # Slightly rising encounter odds with time and steps
         minutes = self.game.elapsed_minutes()
-        chance = self.encounter_base + min(0.25, minutes * 0.01) + self.steps_since_last_encounter * 0.003
-        if random.random() < chance:
+        chance = encounter_chance(minutes, self.steps_since_last_encounter, self.encounter_base)
+        if self.rng.random() < chance:
             self.steps_since_last_encounter = 0
-            # Trigger encounter
-            biome = biome
-            from battle import Battle
-            self.game.set_state("battle", overworld=self, party=self.party, biome=biome)
+            # Trigger encounter, with the pre-rolled enemies if they are still
+            # current for this biome; otherwise Battle rolls fresh ones
+            enemies = self._next_encounter[2] if self._preroll_matches(biome, minutes) else None
+            self._next_encounter = None
+            self.game.set_state("battle", overworld=self, party=self.party, biome=biome, enemies=enemies)
+            return True
+        return False
 
     def handle_event(self, event):
         # If dialogue is active, it consumes input
@@ -130,6 +192,14 @@ class Overworld:
                 return
             if event.key == pygame.K_h:
                 self.help = not self.help
+            if event.key == pygame.K_F5:
+                from savegame import save_game
+                try:
+                    save_game(self)
+                except OSError as e:
+                    self._set_message(f"Save failed: {e.strerror or e}")
+                else:
+                    self._set_message("Game saved.")
             if event.key == pygame.K_e:
                 # 1) Quest node nearby?
                 qn = self._adjacent_quest_node()
@@ -138,6 +208,7 @@ class Overworld:
                     def accept():
                         self.quests.accept_quest(quest)
                         qn['taken'] = True
+                        self.node_index.remove(qn)
                     self.dialogue.open([
                         "You found a quest giver!",
                         quest.title,
@@ -152,11 +223,13 @@ class Overworld:
                         self.dialogue.open(["Party full (max 4)."], on_close=None)
                     else:
                         minutes = self.game.elapsed_minutes()
-                        hp = hp_by_elapsed_minutes(50 + random.randint(-10, 10), minutes)
+                        hp = hp_by_elapsed_minutes(50 + self.rng.randint(-10, 10), minutes, self.rng)
                         new_join = Character(npc["name"], level=max(1, int(minutes)//4 + 1), max_hp=hp)
+                        preload_sprites("characters", [new_join.name])
                         def do_join():
                             self.party.add(new_join)
                             self.npcs.remove(npc)
+                            self.npc_index.remove(npc)
                             msgs = self.quests.on_recruit(new_join.name)
                             if msgs:
                                 self.dialogue.open(msgs)
@@ -177,11 +250,17 @@ class Overworld:
 
     def update(self, dt):
         # Dialogue typewriter update
-        self.dialogue.update(dt)
+        if self.dialogue.update(dt):
+            self.game.invalidate(self.dialogue.rect)
         if self.message:
             self.message_timer -= dt
             if self.message_timer <= 0:
                 self.message = None
+                self.game.invalidate()
+
+        # Safe point for a requested autosave (after a battle or a completed quest)
+        if self.game.autosaver:
+            self.game.autosaver.service(self)
 
         # Lose condition: if party wiped outside battle (shouldn't happen), reset
         if self.party.is_wiped():
@@ -189,6 +268,20 @@ class Overworld:
             from main import boot_new_game
             boot_new_game(self.game)
 
+    def idle(self):
+        # Waiting on input: no typewriter, banner timer, autosave or reset pending
+        autosaver = self.game.autosaver
+        return (not self.message and not self.dialogue.typing
+                and not (autosaver and autosaver.requested) and not self.party.is_wiped())
+
+    def draw_partial(self, screen, rects):
+        # The dialogue box is opaque and on top of everything below it
+        box = self.dialogue.rect
+        if not all(box.contains(r) for r in rects):
+            return False
+        self.dialogue.draw(screen, self.game.alpha)
+        return True
+
     def _set_message(self, text, seconds=2.5):
         self.message = text
         self.message_timer = seconds
@@ -198,48 +291,37 @@ class Overworld:
         # camera
         cam_x = self.player_pos[0] - VIEW_W//2
         cam_y = self.player_pos[1] - VIEW_H//2
-        for ty in range(VIEW_H):
-            for tx in range(VIEW_W):
-                wx = cam_x + tx
-                wy = cam_y + ty
-                biome = self._tile_at(wx, wy)
-                color = (20,20,20) if biome is None else BIOME_COLORS.get(biome, (255,255,255))
-                pygame.draw.rect(screen, color, (tx*TILE, ty*TILE, TILE-1, TILE-1))
-
-        # draw NPCs in view
-        for npc in self.npcs:
-            tx = npc["x"] - cam_x
-            ty = npc["y"] - cam_y
-            if 0 <= tx < VIEW_W and 0 <= ty < VIEW_H:
-                if self.npc_sprite:
-                    sprite = scale_to_fit(self.npc_sprite, TILE, TILE)
-                    nx = tx*TILE + (TILE - sprite.get_width())//2
-                    ny = ty*TILE + (TILE - sprite.get_height())//2
-                    screen.blit(sprite, (nx, ny))
-                else:
-                    pygame.draw.circle(screen, (255, 200, 80), (tx*TILE + TILE//2, ty*TILE + TILE//2), TILE//3)
+        self.tile_cache.draw(screen, cam_x, cam_y, VIEW_W, VIEW_H)
+
+        # draw NPCs in view (scaled sprite comes from the shared scale cache)
+        npc_sprite = scale_to_fit(self.npc_sprite, TILE, TILE) if self.npc_sprite else None
+        view = (cam_x, cam_y, cam_x + VIEW_W, cam_y + VIEW_H)
+        for npc, x, y in self.npc_index.query(*view):
+            tx = x - cam_x
+            ty = y - cam_y
+            if npc_sprite:
+                nx = tx*TILE + (TILE - npc_sprite.get_width())//2
+                ny = ty*TILE + (TILE - npc_sprite.get_height())//2
+                screen.blit(npc_sprite, (nx, ny))
+            else:
+                pygame.draw.circle(screen, (255, 200, 80), (tx*TILE + TILE//2, ty*TILE + TILE//2), TILE//3)
 
         # draw quest nodes
-        for qn in self.quest_nodes:
-            if qn.get('taken'):
-                continue
-            tx = qn['x'] - cam_x
-            ty = qn['y'] - cam_y
-            if 0 <= tx < VIEW_W and 0 <= ty < VIEW_H:
-                pygame.draw.rect(screen, (200, 60, 200), (tx*TILE+6, ty*TILE+6, TILE-12, TILE-12))
+        for qn, x, y in self.node_index.query(*view):
+            tx = x - cam_x
+            ty = y - cam_y
+            pygame.draw.rect(screen, (200, 60, 200), (tx*TILE+6, ty*TILE+6, TILE-12, TILE-12))
 
         # draw active REACH targets as stars
-        for q in self.quests.active:
-            if q.type == 'reach' and q.pos:
-                tx = q.pos[0] - cam_x
-                ty = q.pos[1] - cam_y
-                if 0 <= tx < VIEW_W and 0 <= ty < VIEW_H:
-                    pygame.draw.polygon(screen, (255, 215, 0), [
-                        (tx*TILE+TILE//2, ty*TILE+4),
-                        (tx*TILE+TILE-4, ty*TILE+TILE//2),
-                        (tx*TILE+TILE//2, ty*TILE+TILE-4),
-                        (tx*TILE+4, ty*TILE+TILE//2)
-                    ], 0)
+        for q, x, y in self.quests.markers.query(*view):
+            tx = x - cam_x
+            ty = y - cam_y
+            pygame.draw.polygon(screen, (255, 215, 0), [
+                (tx*TILE+TILE//2, ty*TILE+4),
+                (tx*TILE+TILE-4, ty*TILE+TILE//2),
+                (tx*TILE+TILE//2, ty*TILE+TILE-4),
+                (tx*TILE+4, ty*TILE+TILE//2)
+            ], 0)
 
         # draw player
         px = (self.player_pos[0] - cam_x) * TILE
@@ -254,27 +336,27 @@ class Overworld:
         y = 5
         for mem in self.party.members:
             txt = f"{mem.name} Lv{mem.level} HP {mem.hp}/{mem.max_hp} XP {mem.xp}/{mem.xp_to_next()}"
-            img = self.font.render(txt, True, (255,255,255))
+            img = render_text(self.font, txt, (255,255,255))
             screen.blit(img, (5, y))
             y += 20
 
         biome = self._tile_at(*self.player_pos)
-        loc = self.font.render(f"Tile: {biome}", True, (240,240,240))
+        loc = render_text(self.font, f"Tile: {biome}", (240,240,240))
         screen.blit(loc, (5, y + 5))
 
         if self.help:
             lines = [
-                "Arrows/WASD: Move  E: Interact  H: Help  ESC: Quit",
+                "Arrows/WASD: Move  E: Interact  H: Help  F5: Save  ESC: Quit",
                 "Recruit NPCs in towns/cities (adjacent). Random encounters elsewhere.",
             ]
             for i, line in enumerate(lines):
-                img = self.bigfont.render(line, True, (255,255,255))
+                img = render_text(self.bigfont, line, (255,255,255))
                 screen.blit(img, (20, 460 + i*28))
 
         # Dialogue box on top of everything
-        self.dialogue.draw(screen)
+        self.dialogue.draw(screen, self.game.alpha)
 
         if self.message:
-            banner = self.bigfont.render(self.message, True, (255,255,255))
+            banner = render_text(self.bigfont, self.message, (255,255,255))
             rect = banner.get_rect(center=(screen.get_width()//2, 20))
             screen.blit(banner, rect)
@@ -1,5 +1,9 @@
-import random
+import itertools
 from collections import defaultdict
+from utils.spatial import SpatialHash
+
+# Biomes quest-giver nodes ('!' markers) are placed on, safe and unsafe
+NODE_BIOMES = ("town", "city", "forest", "plains", "desert", "swamp", "mountain")
 
 class QuestStatus:
     ACTIVE = "active"
@@ -40,46 +44,34 @@ class Quest:
 class QuestManager:
     def __init__(self, overworld):
         self.ow = overworld
-        self.active = []
-        self.completed = []
+        self.rng = overworld.game.rng("quests")
+        # Quests by id; dicts keep acceptance order and complete in O(1)
+        self.active = {}
+        self.completed = {}
         self.side_nodes = []  # [{'x':, 'y':, 'taken':False}]
         self.main_started = False
         self.main_completed = False
         self.main_step = 0
         self.main_target = None  # step-specific coordinate
+        # Event indexes over active quests, so each event only touches the
+        # quests it can affect
+        self.markers = SpatialHash()  # REACH by target tile
+        self.hunts = defaultdict(dict)  # HUNT by (target, biome or None) -> {id: quest}
+        self.recruits = defaultdict(dict)  # RECRUIT by target name or None -> {id: quest}
+        self._order = {}  # active quest id -> acceptance sequence number
+        self._accepted = itertools.count()
 
     def generate_world_nodes(self, grid, count=8):
-        # Spawn quest nodes as '!' markers in safe and unsafe areas
-        import random
-        H, W = len(grid), len(grid[0])
-        tries = 0
-        nodes = []
-        preferred = {"town", "city", "forest", "plains", "desert", "swamp", "mountain"}
-        startx, starty = self.ow.player_pos
-        while len(nodes) < count and tries < count * 200:
-            tries += 1
-            x = random.randrange(W)
-            y = random.randrange(H)
-            if grid[y][x] in preferred:
-                if abs(x - startx) + abs(y - starty) > 6:
-                    nodes.append({"x": x, "y": y, "taken": False})
+        # Spawn quest nodes as '!' markers; sampled straight from the biome
+        # index, keeping clear of the start tile
+        spots = grid.sample_tiles(NODE_BIOMES, count, self.rng, center=self.ow.player_pos, min_dist=7)
+        nodes = [{"x": x, "y": y, "taken": False} for x, y in spots]
         self.side_nodes = nodes
         return nodes
 
     # ----- Helpers -----
     def _nearest_tile_of_type(self, start, target_biome):
-        grid = self.ow.map
-        H, W = len(grid), len(grid[0])
-        sx, sy = start
-        best = None
-        best_d = 10**9
-        for y in range(H):
-            for x in range(W):
-                if grid[y][x] == target_biome:
-                    d = abs(x - sx) + abs(y - sy)
-                    if d < best_d:
-                        best_d, best = d, (x, y)
-        return best or (W//2, H//2)
+        return self.ow.map.nearest_tile_of_type(tuple(start), target_biome)
 
     def _new_id(self):
         return f"Q{len(self.active) + len(self.completed) + 1:03d}"
@@ -100,7 +92,7 @@ class QuestManager:
             f"Reach the catacombs at {dungeon_pos} and search for clues."
         ]
         q = Quest(self._new_id(), title, "Investigate the catacombs.", QuestType.REACH, reward_xp=120, pos=dungeon_pos, is_main=True, main_step=1)
-        self.active.append(q)
+        self.accept_quest(q)
         return desc_lines
 
     def _advance_main_after(self, step):
@@ -108,12 +100,12 @@ class QuestManager:
         lines = []
         if step == 1:
             # Step 2: Hunt dungeon foes to recover pages
-            target = random.choice(["Ghoul", "Mimic", "Warg"])
-            need = random.randint(3, 5)
+            target = self.rng.choice(["Ghoul", "Mimic", "Warg"])
+            need = self.rng.randint(3, 5)
             title = "Main 2: Shadows in the Catacombs"
             desc = f"Recover the torn journal pages. Defeat {need} {target}(s) in the dungeon."
             q = Quest(self._new_id(), title, desc, QuestType.HUNT, reward_xp=140, target=target, biome="dungeon", count=need, is_main=True, main_step=2)
-            self.active.append(q)
+            self.accept_quest(q)
             self.main_step = 2
             lines = [
                 "You discover a sealed chamber and a trail of shredded parchment.",
@@ -126,7 +118,7 @@ class QuestManager:
             title = "Main 3: The Archivist's Cipher"
             desc = f"Bring the torn pages to the city archivist at {city_pos}."
             q = Quest(self._new_id(), title, desc, QuestType.REACH, reward_xp=160, pos=city_pos, is_main=True, main_step=3)
-            self.active.append(q)
+            self.accept_quest(q)
             self.main_step = 3
             lines = [
                 "Among the pages is a ciphered note sealed with the royal crest.",
@@ -139,7 +131,7 @@ class QuestManager:
             title = "Main 4: Confrontation at the Heights"
             desc = f"The cipher names the Captain of the Guard. Confront them at the mountain pass {mount_pos}."
             q = Quest(self._new_id(), title, desc, QuestType.REACH, reward_xp=220, pos=mount_pos, is_main=True, main_step=4)
-            self.active.append(q)
+            self.accept_quest(q)
             self.main_step = 4
             lines = [
                 "Decoded: The scribe named the Captain of the Guard as the conspirator.",
@@ -160,24 +152,24 @@ class QuestManager:
     # ----- Side Quests -----
     def create_side_quest_at(self, node):
         biome = self.ow._tile_at(node['x'], node['y'])
-        qtype = random.choices(
+        qtype = self.rng.choices(
             [QuestType.HUNT, QuestType.REACH, QuestType.RECRUIT],
             weights=[5, 3, 2],
             k=1
         )[0]
 
         if qtype == QuestType.HUNT:
-            from battle import Battle
-            pool = Battle.ENEMY_TABLE.get(biome, Battle.ENEMY_TABLE["plains"])
+            from battle_core import enemy_pool
+            pool = enemy_pool(biome)
             names, weights = zip(*pool)
-            target = random.choices(names, weights=weights, k=1)[0]
-            need = random.randint(3, 6)
+            target = self.rng.choices(names, weights=weights, k=1)[0]
+            need = self.rng.randint(3, 6)
             title = f"Hunt: {target} Trouble"
             desc = f"Defeat {need} {target}(s) in the {biome}."
             return Quest(self._new_id(), title, desc, QuestType.HUNT, reward_xp=80, target=target, biome=biome, count=need)
 
         if qtype == QuestType.REACH:
-            goal_biome = random.choice(["mountain", "forest", "desert", "swamp", "plains", "city", "town", "dungeon"])
+            goal_biome = self.rng.choice(["mountain", "forest", "desert", "swamp", "plains", "city", "town", "dungeon"])
             goal_pos = self._nearest_tile_of_type((node['x'], node['y']), goal_biome)
             title = f"Scout: Reach the {goal_biome} marker"
             desc = f"Travel to {goal_pos} and report back (it'll auto-complete on arrival)."
@@ -189,6 +181,10 @@ class QuestManager:
         return Quest(self._new_id(), title, desc, QuestType.RECRUIT, reward_xp=50)
 
     # ----- Event Hooks -----
+    def _in_order(self, quests):
+        # Matches from several index buckets, back in acceptance order
+        return sorted(quests, key=lambda q: self._order[q.id])
+
     def on_enemy_defeated_batch(self, enemies, biome):
         msgs = []
         name_counts = defaultdict(int)
@@ -196,70 +192,98 @@ class QuestManager:
             if not e.alive:
                 name_counts[e.name] += 1
 
-        for q in list(self.active):
+        matches = []
+        for name in name_counts:
+            for key in {(name, biome or None), (name, None)}:
+                bucket = self.hunts.get(key)
+                if bucket:
+                    matches += bucket.values()
+        for q in self._in_order(matches):
             if q.status != QuestStatus.ACTIVE:
                 continue
-            if q.type == QuestType.HUNT:
-                if q.biome and (biome != q.biome):
-                    continue
-                if q.target in name_counts:
-                    q.progress += name_counts[q.target]
-                    if q.progress >= q.required:
-                        msgs += self._complete(q)
-                        # If this was a main step, advance chain
-                        if q.is_main:
-                            msgs += self._advance_main_after(q.main_step)
-                    else:
-                        msgs.append(f"Quest progress — {q.title}: {q.progress}/{q.required}")
+            q.progress += name_counts[q.target]
+            if q.progress >= q.required:
+                msgs += self._complete(q)
+                # If this was a main step, advance chain
+                if q.is_main:
+                    msgs += self._advance_main_after(q.main_step)
+            else:
+                msgs.append(f"Quest progress — {q.title}: {q.progress}/{q.required}")
         return msgs
 
     def on_enter_tile(self, x, y, biome):
         msgs = []
-        # REACH quests
-        for q in list(self.active):
+        # REACH quests targeting this tile
+        for q in self._in_order(self.markers.at(x, y)):
             if q.status != QuestStatus.ACTIVE:
                 continue
-            if q.type == QuestType.REACH and q.pos and (x, y) == q.pos:
-                msgs += self._complete(q)
-                if q.is_main:
-                    msgs += self._advance_main_after(q.main_step)
+            msgs += self._complete(q)
+            if q.is_main:
+                msgs += self._advance_main_after(q.main_step)
         return msgs
 
     def on_recruit(self, npc_name):
         msgs = []
-        for q in list(self.active):
+        matches = list(self.recruits.get(npc_name, {}).values()) + list(self.recruits.get(None, {}).values())
+        for q in self._in_order(matches):
             if q.status != QuestStatus.ACTIVE:
                 continue
-            if q.type == QuestType.RECRUIT and (q.target is None or q.target == npc_name):
-                msgs += self._complete(q)
-                if q.is_main:
-                    msgs += self._advance_main_after(q.main_step)
+            msgs += self._complete(q)
+            if q.is_main:
+                msgs += self._advance_main_after(q.main_step)
         return msgs
 
     # ----- API -----
     def accept_quest(self, quest):
-        self.active.append(quest)
+        self.active[quest.id] = quest
+        self._order[quest.id] = next(self._accepted)
+        if quest.type == QuestType.REACH and quest.pos:
+            self.markers.insert(quest, *quest.pos)
+        elif quest.type == QuestType.HUNT:
+            self.hunts[(quest.target, quest.biome or None)][quest.id] = quest
+        elif quest.type == QuestType.RECRUIT:
+            self.recruits[quest.target][quest.id] = quest
+
+    def _unindex(self, quest):
+        self._order.pop(quest.id, None)
+        if quest.type == QuestType.REACH:
+            self.markers.remove(quest)
+        elif quest.type == QuestType.HUNT:
+            key = (quest.target, quest.biome or None)
+            bucket = self.hunts.get(key)
+            if bucket is not None:
+                bucket.pop(quest.id, None)
+                if not bucket:
+                    del self.hunts[key]
+        elif quest.type == QuestType.RECRUIT:
+            bucket = self.recruits.get(quest.target)
+            if bucket is not None:
+                bucket.pop(quest.id, None)
+                if not bucket:
+                    del self.recruits[quest.target]
 
     def list_active_lines(self):
         if not self.active:
             return ["No active quests. Explore towns and '!' markers to find some."]
         lines = ["Active Quests:"]
-        lines += [f" - {q.short_line()}" for q in self.active]
+        lines += [f" - {q.short_line()}" for q in self.active.values()]
         return lines
 
     def list_completed_lines(self):
         if not self.completed:
             return ["No completed quests yet."]
         lines = ["Completed Quests:"]
-        lines += [f" - {q.title}" for q in self.completed]
+        lines += [f" - {q.title}" for q in self.completed.values()]
         return lines
 
     # ----- Internals -----
     def _complete(self, quest):
         quest.status = QuestStatus.COMPLETED
-        if quest in self.active:
-            self.active.remove(quest)
-        self.completed.append(quest)
+        self.active.pop(quest.id, None)
+        self._unindex(quest)
+        self.completed[quest.id] = quest
+        if self.ow.game.autosaver:
+            self.ow.game.autosaver.request()
         # Reward party XP
         reward = quest.reward_xp
         leveled_any = False
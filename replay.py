@@ -0,0 +1,138 @@
+"""Input recording and deterministic fast replay.
+
+A session is fully determined by the game seed (RngStreams), the per-frame dt
+fed to Game.advance (which turns it into fixed logic ticks), and the input
+events handled on each frame. Set
+JRPG_RECORD=session.json when running main.py to record one; replay it
+headless, as fast as the CPU allows, with
+
+    python replay.py session.json [--draw]
+
+The recording stores a digest of the final game state; replay recomputes it
+and reports whether the result is bit-identical.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+RECORDING_VERSION = 2  # 2: frame dts drive fixed-step ticks
+_EVENT_ATTRS = ("key", "mod", "unicode", "scancode", "button", "pos")
+
+
+def _recorded_types():
+    import pygame
+    return {pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP}
+
+
+class InputRecorder:
+    """Collects the frame clock (dt per frame) and the input events of a session."""
+
+    def __init__(self, game):
+        self.game = game
+        self.seed = game.rngs.seed
+        self.size = list(game.screen.get_size())
+        self.dts = []
+        self.events = []  # [frame, type, {attrs}]
+        self._types = _recorded_types()
+
+    def begin_frame(self, dt):
+        self.dts.append(dt)
+
+    def record(self, event):
+        if event.type not in self._types:
+            return
+        attrs = {}
+        for name in _EVENT_ATTRS:
+            if hasattr(event, name):
+                value = getattr(event, name)
+                attrs[name] = list(value) if isinstance(value, tuple) else value
+        self.events.append([len(self.dts) - 1, event.type, attrs])
+
+    def save(self, path):
+        data = {
+            "version": RECORDING_VERSION,
+            "seed": self.seed,
+            "size": self.size,
+            "dts": self.dts,
+            "events": self.events,
+            "digest": state_digest(self.game),
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+
+def state_digest(game):
+    """Hash of everything a replay must reproduce: state, world, party, quests, RNG streams."""
+    parts = [game.current_name, game.rngs.getstate()]
+    ow = game.states["overworld"].ow if "overworld" in game.states else None
+    if ow is not None:
+        parts.append(list(ow.player_pos))
+        parts.append([(m.name, m.level, m.hp, m.max_hp, m.xp, [a.name for a in m.abilities]) for m in ow.party.members])
+        parts.append([(n["x"], n["y"], n["name"]) for n in ow.npcs])
+        parts.append([(n["x"], n["y"], n.get("taken")) for n in ow.quest_nodes])
+        q = ow.quests
+        parts.append([(x.id, x.type, x.progress, x.status, x.pos) for x in list(q.active.values()) + list(q.completed.values())])
+        parts.append((q.main_step, q.main_started, q.main_completed))
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def load_recording(path):
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != RECORDING_VERSION:
+        raise ValueError(f"unsupported recording version {data.get('version')}")
+    return data
+
+
+def replay(path, draw=False):
+    """Re-run a recording headless with no frame cap. Returns (game, digest, wall_seconds)."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from engine import VirtualClock
+    from main import create_game
+
+    data = load_recording(path)
+    pygame.init()
+    screen = pygame.display.set_mode(tuple(data["size"]))
+    clock = VirtualClock()
+    game = create_game(screen, clock=clock, seed=data["seed"])
+
+    by_frame = {}
+    for frame, etype, attrs in data["events"]:
+        if "pos" in attrs:
+            attrs["pos"] = tuple(attrs["pos"])
+        by_frame.setdefault(frame, []).append(pygame.event.Event(etype, attrs))
+
+    t0 = time.perf_counter()
+    for frame, dt in enumerate(data["dts"]):
+        if not game.running:
+            break
+        # Same order as main(): handle input, run the ticks this frame owes, draw
+        for event in by_frame.get(frame, ()):
+            game.handle_event(event)
+        game.advance(dt)
+        if draw:
+            game.draw()
+    wall = time.perf_counter() - t0
+    return game, state_digest(game), wall
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a recorded session headless")
+    ap.add_argument("recording")
+    ap.add_argument("--draw", action="store_true", help="also render every frame offscreen")
+    args = ap.parse_args(argv)
+
+    expected = load_recording(args.recording)["digest"]
+    game, digest, wall = replay(args.recording, draw=args.draw)
+    frames = len(load_recording(args.recording)["dts"])
+    status = "identical" if digest == expected else "MISMATCH"
+    print(f"{frames} frames in {wall:.2f}s ({frames / max(wall, 1e-9):,.0f} frames/s); final state {status}")
+    return 0 if digest == expected else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
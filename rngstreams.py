@@ -0,0 +1,35 @@
+import hashlib
+import random
+
+SEED_MASK = 2**64 - 1
+
+
+class RngStreams:
+    """Named, independently seeded random.Random streams derived from one seed.
+
+    Each subsystem draws from its own stream (game.rng("battle"), ...), so what
+    one subsystem consumes never shifts another's sequence, and a session is
+    reproducible from the seed plus its inputs.
+    """
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**63)
+        # Saves store the seed as an unsigned 64-bit field
+        self.seed = seed & SEED_MASK
+        self._streams = {}
+
+    def get(self, name):
+        stream = self._streams.get(name)
+        if stream is None:
+            digest = hashlib.sha256(f"{self.seed}:{name}".encode()).digest()
+            stream = random.Random(int.from_bytes(digest[:8], "big"))
+            self._streams[name] = stream
+        return stream
+
+    def getstate(self):
+        return {name: stream.getstate() for name, stream in sorted(self._streams.items())}
+
+    def setstate(self, states):
+        for name, state in states.items():
+            self.get(name).setstate(state)
@@ -0,0 +1,399 @@
+"""Versioned binary save format.
+
+Layout: a fixed header, a section table, then the sections. The map section
+holds the biome ids as packed bytes (one per tile), so load_game memory-maps
+the file and wraps them with np.frombuffer instead of regenerating the world;
+everything else is small fixed-size struct records with length-prefixed
+strings. Saving what load_game returns reproduces the same bytes. Sections
+may be zlib-compressed (autosaves are); those are inflated on load.
+
+    header:   magic, version, section count
+    table:    (tag, flags, offset, length) per section
+    sections: META, MAP, PRTY, NPCS, NODE, QST, RNG
+"""
+import mmap
+import os
+import struct
+import zlib
+import numpy as np
+from entities import Character, Party, BASIC_ABILITIES, LEARN_SET
+from mapgen import MapGrid
+from quests import Quest
+from world import ChunkedWorld
+from utils.assets import preload_sprites
+
+# What load_game raises for a missing, empty, torn, foreign or outdated save
+LOAD_ERRORS = (OSError, ValueError, KeyError, struct.error, zlib.error)
+
+MAGIC = b"JRPGSAVE"
+SAVE_VERSION = 1
+SAVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves")
+SAVE_PATH = os.path.join(SAVE_DIR, "slot1.sav")
+AUTOSAVE_PATH = os.path.join(SAVE_DIR, "autosave.sav")
+SECTION_ZLIB = 1
+
+_HEADER = struct.Struct("<8sHH")
+_SECTION = struct.Struct("<4sIQQ")
+_MAP_GRID, _MAP_CHUNKED = 0, 1
+_NO_POS = -2**31  # sentinel x for a missing (x, y)
+
+ABILITIES = {a.name: a for a in BASIC_ABILITIES + [a for _, a in LEARN_SET]}
+
+
+class _Writer:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def pack(self, fmt, *values):
+        self.buf += struct.pack("<" + fmt, *values)
+
+    def str(self, s):
+        data = s.encode("utf-8")
+        self.pack("H", len(data))
+        self.buf += data
+
+    def opt_str(self, s):
+        self.pack("B", s is not None)
+        if s is not None:
+            self.str(s)
+
+    def pos(self, p):
+        self.pack("ii", *(p if p is not None else (_NO_POS, 0)))
+
+
+class _Reader:
+    def __init__(self, buf, offset):
+        self.buf = buf
+        self.off = offset
+
+    def unpack(self, fmt):
+        fmt = "<" + fmt
+        values = struct.unpack_from(fmt, self.buf, self.off)
+        self.off += struct.calcsize(fmt)
+        return values
+
+    def one(self, fmt):
+        return self.unpack(fmt)[0]
+
+    def str(self):
+        n = self.one("H")
+        s = bytes(self.buf[self.off:self.off + n]).decode("utf-8")
+        self.off += n
+        return s
+
+    def opt_str(self):
+        return self.str() if self.one("B") else None
+
+    def pos(self):
+        x, y = self.unpack("ii")
+        return None if x == _NO_POS else (x, y)
+
+    def array(self, count):
+        # Zero-copy view into the mapping
+        ids = np.frombuffer(self.buf, dtype=np.uint8, count=count, offset=self.off)
+        self.off += count
+        return ids
+
+
+# ----- Snapshot and encoding -----
+def snapshot(ow):
+    """Plain-data copy of everything a save holds. Cheap (one array copy plus
+    small tuples) and detached from live objects, so encode() can run on
+    another thread while the game keeps going."""
+    game, world, qm = ow.game, ow.map, ow.quests
+    if isinstance(world, ChunkedWorld):
+        chunks = [(key, np.array(ids, dtype=np.uint8)) for key, ids in world.edited_chunks()]
+        map_data = (_MAP_CHUNKED, world.seed, world.chunk_size, chunks)
+    else:
+        map_data = (_MAP_GRID, world.ids.copy())
+    quest = lambda q: (q.id, q.title, q.description, q.type, q.status, q.target, q.biome,
+                       q.reward_xp, q.required, q.progress, q.is_main, q.main_step, q.pos)
+    return {
+        "meta": (game.rngs.seed, game.clock.ticks_ms() - game.time_started_ms, ow.player_pos[0],
+                 ow.player_pos[1], ow.steps_since_last_encounter, ow.shown_intro),
+        "map": map_data,
+        "party": (ow.party.max_size, [(m.name, m.level, m.max_hp, m.hp, m.xp, [a.name for a in m.abilities])
+                                      for m in ow.party.members]),
+        "npcs": [(n["x"], n["y"], n["name"]) for n in ow.npcs],
+        "nodes": [(n["x"], n["y"], bool(n.get("taken"))) for n in ow.quest_nodes],
+        "quests": (qm.main_started, qm.main_completed, qm.main_step, qm.main_target,
+                   [quest(q) for q in qm.active.values()], [quest(q) for q in qm.completed.values()]),
+        "rngs": game.rngs.getstate(),
+    }
+
+
+def _encode_map(map_data):
+    w = _Writer()
+    if map_data[0] == _MAP_CHUNKED:
+        _, seed, chunk_size, chunks = map_data
+        w.pack("BqII", _MAP_CHUNKED, seed, chunk_size, len(chunks))
+        for (cx, cy), ids in chunks:
+            w.pack("ii", cx, cy)
+            w.buf += ids.tobytes()
+    else:
+        ids = map_data[1]
+        w.pack("BII", _MAP_GRID, ids.shape[1], ids.shape[0])
+        w.buf += ids.tobytes()
+    return w.buf
+
+
+def _encode_party(party):
+    w = _Writer()
+    max_size, members = party
+    w.pack("BB", max_size, len(members))
+    for name, level, max_hp, hp, xp, abilities in members:
+        w.str(name)
+        w.pack("iiiiB", level, max_hp, hp, xp, len(abilities))
+        for a in abilities:
+            w.str(a)
+    return w.buf
+
+
+def _encode_npcs(npcs):
+    w = _Writer()
+    w.pack("I", len(npcs))
+    for x, y, name in npcs:
+        w.pack("ii", x, y)
+        w.str(name)
+    return w.buf
+
+
+def _encode_nodes(nodes):
+    w = _Writer()
+    w.pack("I", len(nodes))
+    for node in nodes:
+        w.pack("iiB", *node)
+    return w.buf
+
+
+def _write_quest(w, q):
+    qid, title, description, qtype, status, target, biome, reward_xp, required, progress, is_main, main_step, pos = q
+    for s in (qid, title, description, qtype, status):
+        w.str(s)
+    w.opt_str(target)
+    w.opt_str(biome)
+    w.pack("iiiBi", reward_xp, required, progress, is_main, main_step or 0)
+    w.pos(pos)
+
+
+def _encode_quests(quests):
+    w = _Writer()
+    started, completed, step, target, active, done = quests
+    w.pack("BBi", started, completed, step)
+    w.pos(target)
+    for group in (active, done):
+        w.pack("I", len(group))
+        for q in group:
+            _write_quest(w, q)
+    return w.buf
+
+
+def _encode_rngs(states):
+    w = _Writer()
+    w.pack("I", len(states))
+    for name, (version, internal, gauss) in states.items():
+        w.str(name)
+        w.pack("B%dI" % len(internal), version, *internal)
+        w.pack("Bd", gauss is not None, gauss or 0.0)
+    return w.buf
+
+
+def encode(snap, compress=False):
+    """Serialize a snapshot() to bytes; compress zlib-packs every section
+    (smaller, but the map can then no longer be mapped straight from disk)."""
+    meta = _Writer()
+    meta.pack("QdiiIB", *snap["meta"])
+    sections = [
+        (b"META", meta.buf),
+        (b"MAP ", _encode_map(snap["map"])),
+        (b"PRTY", _encode_party(snap["party"])),
+        (b"NPCS", _encode_npcs(snap["npcs"])),
+        (b"NODE", _encode_nodes(snap["nodes"])),
+        (b"QST ", _encode_quests(snap["quests"])),
+        (b"RNG ", _encode_rngs(snap["rngs"])),
+    ]
+    flags = 0
+    if compress:
+        flags = SECTION_ZLIB
+        sections = [(tag, zlib.compress(data, 6)) for tag, data in sections]
+    out = bytearray(_HEADER.pack(MAGIC, SAVE_VERSION, len(sections)))
+    offset = len(out) + _SECTION.size * len(sections)
+    for tag, data in sections:
+        out += _SECTION.pack(tag, flags, offset, len(data))
+        offset += len(data)
+    for _, data in sections:
+        out += data
+    return bytes(out)
+
+
+def write_atomic(path, data):
+    # Temp file plus rename: a crash mid-write never leaves a torn save behind
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        # On disk before the rename, or a crash can leave an empty renamed file
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def release_mapping(ow, path):
+    """Copy the map out of its save file mapping if that file is about to be
+    replaced (Windows cannot replace a file that is still mapped)."""
+    world = ow.map
+    if world.mapped_path == os.path.abspath(path):
+        world.detach()
+        world.mapped_path = None
+
+
+def save_game(ow, path=None):
+    """Write the save atomically; returns its size in bytes."""
+    path = path or SAVE_PATH
+    release_mapping(ow, path)
+    data = encode(snapshot(ow))
+    write_atomic(path, data)
+    return len(data)
+
+
+def save_exists(path=None):
+    return latest_save() is not None if path is None else os.path.isfile(path)
+
+
+def save_slots():
+    """The manual save and the autosave that exist, newest first."""
+    found = [p for p in (SAVE_PATH, AUTOSAVE_PATH) if os.path.isfile(p)]
+    return sorted(found, key=os.path.getmtime, reverse=True)
+
+
+def latest_save():
+    """The most recently written of the manual save and the autosave, or None."""
+    slots = save_slots()
+    return slots[0] if slots else None
+
+
+# ----- Decoding -----
+def _sections(buf):
+    magic, version, count = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not a save file")
+    if version != SAVE_VERSION:
+        raise ValueError(f"unsupported save version {version}")
+    table = {}
+    for i in range(count):
+        tag, flags, offset, length = _SECTION.unpack_from(buf, _HEADER.size + i * _SECTION.size)
+        if flags & SECTION_ZLIB:
+            table[tag] = _Reader(bytearray(zlib.decompress(buf[offset:offset + length])), 0)
+        else:
+            table[tag] = _Reader(buf, offset)
+    return table
+
+
+def _decode_map(r):
+    kind = r.one("B")
+    if kind == _MAP_GRID:
+        width, height = r.unpack("II")
+        return MapGrid(r.array(width * height).reshape(height, width))
+    seed, chunk_size, count = r.unpack("qII")
+    world = ChunkedWorld(seed=seed, chunk_size=chunk_size)
+    for _ in range(count):
+        key = r.unpack("ii")
+        world.restore_chunk(key, r.array(chunk_size * chunk_size).reshape(chunk_size, chunk_size))
+    return world
+
+
+def _decode_party(r):
+    max_size, count = r.unpack("BB")
+    members = []
+    for _ in range(count):
+        name = r.str()
+        level, max_hp, hp, xp, n_abilities = r.unpack("iiiiB")
+        abilities = [ABILITIES[r.str()] for _ in range(n_abilities)]
+        m = Character(name, level=level, max_hp=max_hp, abilities=abilities)
+        m.hp, m.xp = hp, xp
+        members.append(m)
+    return Party(members, max_size=max_size)
+
+
+def _read_quest(r):
+    qid, title, description, qtype, status = (r.str() for _ in range(5))
+    target, biome = r.opt_str(), r.opt_str()
+    reward_xp, required, progress, is_main, main_step = r.unpack("iiiBi")
+    q = Quest(qid, title, description, qtype, reward_xp=reward_xp, target=target, biome=biome,
+              count=required, pos=r.pos(), is_main=bool(is_main), main_step=main_step or None)
+    q.progress, q.status = progress, status
+    return q
+
+
+def _decode_quests(r, qm):
+    started, completed, qm.main_step = r.unpack("BBi")
+    qm.main_started, qm.main_completed = bool(started), bool(completed)
+    qm.main_target = r.pos()
+    for q in [_read_quest(r) for _ in range(r.one("I"))]:
+        qm.accept_quest(q)
+    qm.completed = {q.id: q for q in (_read_quest(r) for _ in range(r.one("I")))}
+
+
+def _decode_rngs(r):
+    states = {}
+    for _ in range(r.one("I")):
+        name = r.str()
+        version = r.one("B")
+        internal = r.unpack("625I")
+        has_gauss, gauss = r.unpack("Bd")
+        states[name] = (version, internal, gauss if has_gauss else None)
+    return states
+
+
+def load_game(game, path=None):
+    """Resume from a save (the newest slot if path is None): returns a ready Overworld and restores the game's
+    RNG streams and elapsed time. The map stays backed by the file mapping
+    (copy-on-write, so edits never touch the file). Raises one of LOAD_ERRORS
+    for an unreadable save, leaving the game as it was."""
+    rngs, started = game.rngs, game.time_started_ms
+    try:
+        return _load(game, path)
+    except LOAD_ERRORS:
+        game.rngs, game.time_started_ms = rngs, started
+        raise
+
+
+def _load(game, path):
+    from rngstreams import RngStreams
+    from overworld import Overworld
+    path = path or latest_save() or SAVE_PATH
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    s = _sections(buf)
+
+    seed, elapsed_ms, px, py, steps, shown_intro = s[b"META"].unpack("QdiiIB")
+    game.rngs = RngStreams(seed)
+    game.time_started_ms = game.clock.ticks_ms() - elapsed_ms
+
+    world = _decode_map(s[b"MAP "])
+    world.mapped_path = os.path.abspath(path)  # see release_mapping
+    ow = Overworld(game, world=world)
+    ow.player_pos = [px, py]
+    ow.map.prefetch(px, py)
+    ow.steps_since_last_encounter = steps
+    ow.shown_intro = bool(shown_intro)
+    ow.party = _decode_party(s[b"PRTY"])
+    preload_sprites("characters", [m.name for m in ow.party.members])
+    ow._preload_biome(ow._tile_at(px, py))
+
+    r = s[b"NPCS"]
+    ow.npcs = []
+    for _ in range(r.one("I")):
+        x, y = r.unpack("ii")
+        ow.npcs.append({"x": x, "y": y, "name": r.str()})
+    r = s[b"NODE"]
+    ow.quest_nodes = []
+    for _ in range(r.one("I")):
+        x, y, taken = r.unpack("iiB")
+        ow.quest_nodes.append({"x": x, "y": y, "taken": bool(taken)})
+    ow.quests.side_nodes = ow.quest_nodes
+    ow.index_entities()
+
+    _decode_quests(s[b"QST "], ow.quests)
+    game.rngs.setstate(_decode_rngs(s[b"RNG "]))
+    return ow
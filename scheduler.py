@@ -0,0 +1,130 @@
+"""Battle turn scheduling: a heap of actors keyed by next-action time.
+
+ATB-style: each actor waits TURN_DELAY / speed time units between actions, so
+a combatant twice as fast acts twice as often, and haste/slow scale the speed
+of one actor (stretching or shrinking the wait it has left). Actors that tie
+act in the order they were scheduled. Nothing is ever removed from the middle
+of the heap: dead actors and superseded entries are dropped as they reach the
+top, so each turn costs O(log n) however large the battle.
+"""
+import heapq
+import itertools
+
+TURN_DELAY = 1000.0
+
+
+class _Timer:
+    __slots__ = ("actor", "ready_at", "last_at", "rate", "version")
+
+    def __init__(self, actor, now):
+        self.actor = actor
+        self.ready_at = now
+        self.last_at = now
+        self.rate = 1.0  # haste/slow multiplier on the actor's speed
+        self.version = 0
+
+
+class TurnScheduler:
+    def __init__(self, actors=()):
+        self.time = 0.0
+        self.turns = 0  # actions taken so far
+        self._heap = []  # (ready_at, seq, version, timer)
+        self._timers = {}  # id(actor) -> _Timer
+        self._seq = itertools.count()
+        for actor in actors:
+            self.add(actor)
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, actor):
+        return id(actor) in self._timers
+
+    def wait_for(self, actor):
+        """Time units between two actions of this actor at its current speed."""
+        timer = self._timers.get(id(actor))
+        rate = timer.rate if timer is not None else 1.0
+        return TURN_DELAY / (max(1, actor.speed) * rate)
+
+    def add(self, actor, delay=None):
+        """Schedule an actor (e.g. a summon) a full wait from now, or after delay."""
+        timer = self._timers[id(actor)] = _Timer(actor, self.time)
+        timer.ready_at = self.time + (self.wait_for(actor) if delay is None else delay)
+        self._push(timer)
+
+    def remove(self, actor):
+        # The heap entry goes stale and is skipped when it surfaces
+        self._timers.pop(id(actor), None)
+
+    def _push(self, timer):
+        timer.version += 1
+        heapq.heappush(self._heap, (timer.ready_at, next(self._seq), timer.version, timer))
+
+    def current(self):
+        """The actor whose turn it is, or None once nobody is left. Advances
+        the battle clock to that actor's ready time."""
+        heap = self._heap
+        while heap:
+            ready_at, _, version, timer = heap[0]
+            if version != timer.version or self._timers.get(id(timer.actor)) is not timer:
+                heapq.heappop(heap)
+            elif not timer.actor.alive:
+                heapq.heappop(heap)
+                del self._timers[id(timer.actor)]
+            else:
+                self.time = ready_at
+                return timer.actor
+        return None
+
+    def end_turn(self):
+        """The current actor has acted: schedule its next action."""
+        actor = self.current()
+        if actor is None:
+            return
+        timer = heapq.heappop(self._heap)[3]
+        self.turns += 1
+        timer.last_at = self.time
+        timer.ready_at = self.time + self.wait_for(actor)
+        self._push(timer)
+
+    def set_rate(self, actor, rate):
+        """Change an actor's speed multiplier; the wait it has left scales with it."""
+        timer = self._timers.get(id(actor))
+        if timer is None or rate <= 0:
+            return
+        remaining = max(0.0, timer.ready_at - self.time) * timer.rate / rate
+        timer.rate = rate
+        timer.ready_at = self.time + remaining
+        self._push(timer)
+
+    def haste(self, actor, factor=2.0):
+        timer = self._timers.get(id(actor))
+        if timer is not None:
+            self.set_rate(actor, timer.rate * factor)
+
+    def slow(self, actor, factor=2.0):
+        self.haste(actor, 1.0 / factor)
+
+    def gauge(self, actor):
+        """ATB fill in [0, 1]: how much of its current wait the actor has served."""
+        timer = self._timers.get(id(actor))
+        if timer is None:
+            return 0.0
+        span = timer.ready_at - timer.last_at
+        return 1.0 if span <= 0 else min(1.0, max(0.0, (self.time - timer.last_at) / span))
+
+    def upcoming(self, count):
+        """The next count turns (actors repeat) assuming nobody dies or changes
+        speed, for lookahead and turn-order displays. The schedule is untouched."""
+        heap = [(ready_at, 0, seq, timer) for ready_at, seq, version, timer in self._heap
+                if version == timer.version and self._timers.get(id(timer.actor)) is timer and timer.actor.alive]
+        heapq.heapify(heap)
+        order = []
+        for n in range(count):
+            if not heap:
+                break
+            ready_at, _, _, timer = heapq.heappop(heap)
+            order.append(timer.actor)
+            # Re-scheduled actors queue behind everyone already waiting, as in end_turn
+            heapq.heappush(heap, (ready_at + self.wait_for(timer.actor), 1, n, timer))
+        return order
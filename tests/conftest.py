@@ -0,0 +1,33 @@
+import os
+import sys
+import pytest
+
+# Tests import the game's top-level modules and run pygame without a display
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+@pytest.fixture(scope="session")
+def screen():
+    """A dummy-driver display (convert_alpha and the game states need one)."""
+    import pygame
+    pygame.init()
+    yield pygame.display.set_mode((800, 600))
+    pygame.quit()
+
+
+@pytest.fixture
+def new_overworld(screen):
+    """Factory for a fresh game (virtual clock, given seed) in a new overworld:
+    new_overworld(seed) -> (game, ow)."""
+    from engine import VirtualClock
+    from main import create_game
+    from overworld import Overworld
+
+    def make(seed=1):
+        game = create_game(screen, clock=VirtualClock(), seed=seed)
+        ow = Overworld(game)
+        game.set_state("overworld", overworld=ow)
+        return game, ow
+    return make
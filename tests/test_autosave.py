@@ -0,0 +1,37 @@
+import os
+import struct
+import savegame
+from autosave import Autosaver
+
+
+def test_writes_requested_saves_in_the_background(new_overworld, tmp_path):
+    game, ow = new_overworld(99)
+    path = str(tmp_path / "auto.sav")
+    saver = Autosaver(game, path=path)
+    saver.request()
+    saver.service(ow)
+    assert saver.flush(timeout=10)
+    saver.service(ow)  # publishes the finished write
+    assert saver.saves == 1
+    assert game.stats.totals["autosave_bytes"] == os.path.getsize(path)
+    saver.close()
+
+
+def test_worker_survives_encode_errors(new_overworld, tmp_path):
+    game, ow = new_overworld(99)
+    saver = Autosaver(game, path=str(tmp_path / "auto.sav"))
+    bad = savegame.snapshot(ow)
+    bad["meta"] = (-1,) + bad["meta"][1:]  # not packable as an unsigned seed
+    saver._submit(bad)
+    # flush() must not hang on a failed write
+    assert saver.flush(timeout=10)
+    assert isinstance(saver.errors[0], struct.error)
+
+    saver.service(ow)
+    assert game.stats.totals["autosave_errors"] == 1
+    saver._submit(savegame.snapshot(ow))
+    assert saver.flush(timeout=10)
+    saver.service(ow)
+    assert saver.saves == 1
+    saver.close()
+    assert saver._thread is None
@@ -0,0 +1,51 @@
+import random
+from battle_ai import AI_LEVELS, EnemyAI, TranspositionTable
+from battle_core import BattleModel, greedy_policy, spawn_enemies
+from entities import Character, Party
+
+
+def _battle(ai, seed, biome="dungeon", minutes=10):
+    rng = random.Random(seed)
+    party = Party([Character(f"P{i}", level=3, max_hp=80) for i in range(3)])
+    model = BattleModel(party, spawn_enemies(biome, minutes, rng), policy=greedy_policy, rng=rng, enemy_policy=ai)
+    moves = []
+    while not model.over and model.turns < 400:
+        event = model.step()
+        if event is None:
+            break
+        moves.append((event.actor.name, event.ability.name, event.target.name, event.amount))
+    return model, moves
+
+
+def test_moves_do_not_depend_on_the_time_budget():
+    for seed in range(10):
+        _, patient = _battle(EnemyAI(3, budget_ms=1e9, table=TranspositionTable()), seed)
+        rushed_ai = EnemyAI(3, budget_ms=0.0, table=TranspositionTable())
+        _, rushed = _battle(rushed_ai, seed)
+        assert rushed == patient
+        # Overrunning the budget is only counted
+        assert rushed_ai.timeouts == rushed_ai.decisions > 0
+
+
+def test_search_stops_at_the_node_cap():
+    ai = EnemyAI(3, table=TranspositionTable())
+    _battle(ai, seed=3)
+    assert 0 < ai.last["nodes"] <= AI_LEVELS[3].max_nodes + 1
+    assert ai.last["depth"] >= 1
+
+
+def test_table_is_cleared_for_each_new_battle():
+    table = TranspositionTable()
+    ai = EnemyAI(3, table=table)
+    model, _ = _battle(ai, seed=1)
+    assert table.owner is model
+    assert table.stats()["entries"] > 0
+    model2, moves = _battle(ai, seed=2)
+    assert table.owner is model2
+
+    # Nothing from the first battle is left to influence the second
+    fresh = TranspositionTable()
+    _, fresh_moves = _battle(EnemyAI(3, table=fresh), seed=2)
+    assert moves == fresh_moves
+    assert table.stats()["entries"] == fresh.stats()["entries"]
+    assert table.stats()["evictions"] == 0
@@ -0,0 +1,129 @@
+import pygame
+import pytest
+from engine import Game, State, VirtualClock, MAX_DIRTY_RECTS, MAX_TICKS_PER_FRAME, TICK_DT
+
+
+class Recorder(State):
+    def __init__(self, game=None, idle=False):
+        super().__init__(game)
+        self.updates = 0
+        self.draws = 0
+        self._idle = idle
+
+    def update(self, dt):
+        assert dt == TICK_DT
+        self.updates += 1
+
+    def draw(self, screen):
+        self.draws += 1
+        self.clip = screen.get_clip()
+
+    def idle(self):
+        return self._idle
+
+
+def _game(state):
+    game = Game(pygame.Surface((64, 48)), {"s": state}, clock=VirtualClock())
+    state.game = game
+    game.set_state("s")
+    return game
+
+
+def test_partial_frames_accumulate_into_ticks():
+    state = Recorder()
+    game = _game(state)
+    assert game.advance(TICK_DT / 2) == 0
+    assert game.alpha == pytest.approx(0.5)
+    assert game.advance(TICK_DT / 2) == 1
+    assert game.advance(3 * TICK_DT + TICK_DT / 4) == 3
+    assert state.updates == game.ticks == 4
+    assert game.alpha == pytest.approx(0.25)
+
+
+def test_slow_frame_catches_up_then_drops_the_backlog():
+    state = Recorder()
+    game = _game(state)
+    ran = game.advance(0.5)  # 30 ticks owed
+    assert ran == state.updates == MAX_TICKS_PER_FRAME
+    assert game.stats.totals["ticks_dropped"] == 30 - MAX_TICKS_PER_FRAME
+    # Dropped ticks skip their updates but game time still covers them
+    assert game.ticks == 30
+    assert game.clock.ticks_ms() == pytest.approx(500.0)
+    assert game.elapsed_minutes() == pytest.approx(0.5 / 60)
+
+
+def test_game_time_matches_frame_time_at_any_dt():
+    game = _game(Recorder())
+    for _ in range(40):
+        game.advance(0.25)
+    assert game.clock.ticks_ms() == pytest.approx(10000.0, abs=TICK_DT * 1000)
+
+
+def test_idle_states_only_run_the_last_tick():
+    state = Recorder(idle=True)
+    game = _game(state)
+    assert game.advance(4 * TICK_DT + TICK_DT / 2) == 1
+    assert state.updates == 1
+    assert game.ticks == 4
+    assert game.clock.ticks_ms() == pytest.approx(4 * TICK_DT * 1000)
+
+
+class PartialRecorder(Recorder):
+    def __init__(self):
+        super().__init__()
+        self.partial = []
+
+    def draw_partial(self, screen, rects):
+        self.partial.append(list(rects))
+        return True
+
+
+def test_nothing_is_redrawn_until_invalidated():
+    state = Recorder()
+    game = _game(state)
+    assert game.draw() == [pygame.Rect(0, 0, 64, 48)]
+    assert game.draw() == []
+    assert state.draws == 1
+
+
+def test_dirty_rects_redraw_clipped():
+    state = Recorder()
+    game = _game(state)
+    game.draw()
+    game.invalidate((4, 4, 8, 8))
+    game.invalidate((20, 10, 4, 4))
+    rects = game.draw()
+    assert rects == [pygame.Rect(4, 4, 8, 8), pygame.Rect(20, 10, 4, 4)]
+    assert state.draws == 2
+    assert state.clip == pygame.Rect(4, 4, 20, 10)
+    assert game.screen.get_clip() == game.screen.get_rect()
+
+
+def test_states_can_repaint_dirty_rects_themselves():
+    state = PartialRecorder()
+    game = _game(state)
+    game.draw()
+    game.invalidate((1, 2, 3, 4))
+    game.draw()
+    assert state.partial == [[pygame.Rect(1, 2, 3, 4)]]
+    assert state.draws == 1
+
+
+def test_too_many_dirty_rects_become_a_full_redraw():
+    state = Recorder()
+    game = _game(state)
+    game.draw()
+    for i in range(MAX_DIRTY_RECTS + 1):
+        game.invalidate((i, 0, 1, 1))
+    assert game.draw() == [game.screen.get_rect()]
+
+
+def test_input_invalidates_but_mouse_motion_does_not():
+    game = _game(Recorder(idle=True))
+    game.draw()
+    game.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(1, 1), rel=(1, 1), buttons=(0, 0, 0)))
+    assert not game.dirty
+    assert game.can_sleep()
+    game.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, mod=0, unicode=" ", scancode=0))
+    assert game.dirty
+    assert not game.can_sleep()
@@ -0,0 +1,75 @@
+from entities import Character, CombatantStore, Monster, Party
+
+
+def _wave(*hps):
+    store = CombatantStore()
+    return store, [Monster(f"E{i}", 1, hp, store=store) for i, hp in enumerate(hps)]
+
+
+def test_alive_index_follows_deaths_and_revives():
+    store, (a, b, c) = _wave(10, 20, 30)
+    assert store.alive_count == 3
+    assert store.alive_members() == (a, b, c)
+
+    b.take_damage(25)
+    assert not b.alive
+    assert store.alive_count == 2
+    assert store.alive_members() == (a, c)
+
+    b.hp = 5  # revived: back in slot order
+    assert store.alive_members() == (a, b, c)
+
+    for m in (a, b, c):
+        m.take_damage(100)
+    assert store.alive_count == 0
+    assert store.alive_members() == ()
+    assert store.weakest() is None
+
+
+def test_alive_members_is_reused_until_someone_dies():
+    store, (a, b) = _wave(10, 20)
+    first = store.alive_members()
+    a.take_damage(3)  # still alive: no rebuild
+    assert store.alive_members() is first
+    a.take_damage(50)
+    assert store.alive_members() is not first
+
+
+def test_adopt_moves_a_member_between_stores():
+    party = Party([Character("You")])
+    recruit = Character("Ari", max_hp=40)
+    recruit.take_damage(15)
+    old = recruit._store
+
+    assert party.add(recruit)
+    assert recruit._store is party.store
+    assert (recruit.hp, recruit.max_hp) == (25, 40)
+    assert party.alive_members()[-1] is recruit
+    # The old store no longer counts it among the living
+    assert old.alive_count == 0
+
+    recruit.take_damage(100)
+    assert party.store.alive_count == 1
+    assert not party.is_wiped()
+
+
+def test_of_reuses_the_shared_store():
+    store, wave = _wave(10, 20)
+    assert CombatantStore.of(wave) is store
+    assert CombatantStore.of(wave[:1]) is not store
+
+
+def test_weakest_breaks_ties_by_slot():
+    store, (a, b, c) = _wave(30, 10, 10)
+    assert store.weakest() is b
+    b.take_damage(100)
+    assert store.weakest() is c
+
+
+def test_weakest_on_a_large_wave():
+    store, wave = _wave(*[50 + i % 7 for i in range(100)])
+    wave[40].hp = 3
+    wave[60].hp = 3
+    assert store.weakest() is wave[40]
+    wave[40].take_damage(10)
+    assert store.weakest() is wave[60]
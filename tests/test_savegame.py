@@ -0,0 +1,133 @@
+import os
+import pytest
+import savegame
+from engine import VirtualClock
+from main import create_game
+
+
+def _played(new_overworld, seed=1234):
+    game, ow = new_overworld(seed)
+    # Some state worth saving: time, position, quests, a hurt party, used RNG streams
+    game.clock.advance(125.0)
+    ow.player_pos = [ow.player_pos[0] + 1, ow.player_pos[1]]
+    ow.steps_since_last_encounter = 7
+    ow.quests.trigger_main_on_city_enter(*ow.player_pos)
+    ow.party.members[0].take_damage(9)
+    ow.party.members[0].xp = 13
+    game.rng("battle").random()
+    return game, ow
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_encode_load_round_trip(new_overworld, tmp_path, compress):
+    game, ow = _played(new_overworld)
+    data = savegame.encode(savegame.snapshot(ow), compress=compress)
+    path = tmp_path / "slot.sav"
+    savegame.write_atomic(str(path), data)
+
+    game2, _ = new_overworld(seed=1)
+    ow2 = savegame.load_game(game2, str(path))
+    # Saving what load_game returns reproduces the same bytes
+    assert savegame.encode(savegame.snapshot(ow2), compress=compress) == data
+
+    assert game2.rngs.seed == 1234
+    assert game2.rngs.getstate() == game.rngs.getstate()
+    assert game2.elapsed_minutes() == pytest.approx(game.elapsed_minutes())
+    assert ow2.player_pos == ow.player_pos
+    assert ow2.steps_since_last_encounter == 7
+    assert [(m.name, m.hp, m.xp) for m in ow2.party.members] == [(m.name, m.hp, m.xp) for m in ow.party.members]
+    assert list(ow2.quests.active) == list(ow.quests.active)
+    assert (ow2.map.ids == ow.map.ids).all()
+
+
+def test_compressed_saves_are_smaller(new_overworld):
+    _, ow = _played(new_overworld)
+    snap = savegame.snapshot(ow)
+    assert len(savegame.encode(snap, compress=True)) < len(savegame.encode(snap))
+
+
+def test_seeds_use_the_full_unsigned_64_bit_range(new_overworld, tmp_path):
+    game, ow = new_overworld(seed=2**64 - 1)
+    path = tmp_path / "slot.sav"
+    savegame.write_atomic(str(path), savegame.encode(savegame.snapshot(ow)))
+    game2, _ = new_overworld(seed=1)
+    savegame.load_game(game2, str(path))
+    assert game2.rngs.seed == 2**64 - 1
+
+
+def test_rejects_foreign_files_and_other_versions(new_overworld, tmp_path):
+    _, ow = _played(new_overworld)
+    data = bytearray(savegame.encode(savegame.snapshot(ow)))
+    path = tmp_path / "bad.sav"
+    path.write_bytes(b"NOTASAVE" + bytes(data[8:]))
+    with pytest.raises(ValueError, match="not a save file"):
+        savegame.load_game(new_overworld(1)[0], str(path))
+    data[8] = savegame.SAVE_VERSION + 1
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="unsupported save version"):
+        savegame.load_game(new_overworld(1)[0], str(path))
+
+
+def test_saving_over_the_loaded_slot_releases_its_mapping(new_overworld, tmp_path):
+    _, ow = _played(new_overworld)
+    path = str(tmp_path / "slot.sav")
+    savegame.save_game(ow, path)
+    game2, _ = new_overworld(seed=1)
+    ow2 = savegame.load_game(game2, path)
+    assert ow2.map.ids.base is not None  # a view on the file mapping
+
+    savegame.save_game(ow2, str(tmp_path / "other.sav"))
+    assert ow2.map.mapped_path is not None
+    savegame.save_game(ow2, path)
+    assert ow2.map.ids.base is None
+    assert ow2.map.mapped_path is None
+    assert (savegame.load_game(game2, path).map.ids == ow.map.ids).all()
+
+
+def test_f5_reports_a_failed_save(new_overworld, monkeypatch):
+    import pygame
+    _, ow = _played(new_overworld)
+
+    def refuse(path, data):
+        raise PermissionError(13, "Permission denied", path)
+    monkeypatch.setattr(savegame, "write_atomic", refuse)
+    ow.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_F5, mod=0, unicode="", scancode=0))
+    assert ow.message == "Save failed: Permission denied"
+
+
+def _slots(monkeypatch, tmp_path):
+    manual, auto = str(tmp_path / "slot1.sav"), str(tmp_path / "autosave.sav")
+    monkeypatch.setattr(savegame, "SAVE_PATH", manual)
+    monkeypatch.setattr(savegame, "AUTOSAVE_PATH", auto)
+    return manual, auto
+
+
+@pytest.mark.parametrize("broken", [b"", b"JRPGSAVE\x01", b"NOTASAVE" + bytes(64)])
+def test_continue_falls_back_to_the_older_slot(new_overworld, tmp_path, monkeypatch, broken):
+    from main import continue_game
+    manual, auto = _slots(monkeypatch, tmp_path)
+    _, ow = _played(new_overworld)
+    savegame.save_game(ow, manual)
+    with open(auto, "wb") as f:  # newer, but empty, torn or foreign
+        f.write(broken)
+    os.utime(manual, (0, 0))
+    assert savegame.latest_save() == auto
+
+    game, _ = new_overworld(seed=1)
+    assert continue_game(game)
+    assert game.current_name == "overworld"
+    assert game.rngs.seed == 1234
+
+
+def test_continue_is_withdrawn_when_no_slot_loads(screen, tmp_path, monkeypatch):
+    import pygame
+    manual, _ = _slots(monkeypatch, tmp_path)
+    with open(manual, "wb") as f:
+        f.write(b"JRPGSAVE")
+    game = create_game(screen, clock=VirtualClock(), seed=5)
+    menu = game.states["menu"]
+    assert menu.can_continue
+    menu.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_c, mod=0, unicode="c", scancode=0))
+    assert game.current_name == "menu"
+    assert not menu.can_continue and menu.message
+    assert game.rngs.seed == 5  # the failed load left the game untouched
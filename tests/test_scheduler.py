@@ -0,0 +1,89 @@
+from entities import Monster
+from scheduler import TurnScheduler, TURN_DELAY
+
+
+def _actors(*speeds):
+    return [Monster(f"A{i}", 1, 10, speed=s) for i, s in enumerate(speeds)]
+
+
+def _take(sched, n):
+    order = []
+    for _ in range(n):
+        actor = sched.current()
+        if actor is None:
+            break
+        order.append(actor.name)
+        sched.end_turn()
+    return order
+
+
+def test_equal_speeds_cycle_in_schedule_order():
+    sched = TurnScheduler(_actors(10, 10, 10))
+    assert _take(sched, 7) == ["A0", "A1", "A2", "A0", "A1", "A2", "A0"]
+    assert sched.turns == 7
+
+
+def test_faster_actors_act_proportionally_more():
+    sched = TurnScheduler(_actors(20, 10))
+    order = _take(sched, 30)
+    assert order.count("A0") == 2 * order.count("A1")
+
+
+def test_upcoming_previews_without_consuming():
+    sched = TurnScheduler(_actors(20, 10))
+    preview = [a.name for a in sched.upcoming(6)]
+    assert sched.turns == 0
+    assert preview == _take(sched, 6)
+
+
+def test_haste_and_slow_scale_the_remaining_wait():
+    a, b = _actors(10, 10)
+    sched = TurnScheduler([a, b])
+    sched.haste(b)  # b's first action comes after half the wait
+    assert sched.current() is b
+    assert sched.time == TURN_DELAY / 10 / 2
+    assert sched.wait_for(b) == TURN_DELAY / 10 / 2
+
+    sched.slow(b)  # back to the normal rate; b is still due now
+    assert sched.wait_for(b) == TURN_DELAY / 10
+    assert _take(sched, 4) == ["A1", "A0", "A1", "A0"]
+
+
+def test_gauge_fills_toward_the_next_action():
+    a, b = _actors(10, 5)
+    sched = TurnScheduler([a, b])
+    assert sched.current() is a
+    assert sched.gauge(a) == 1.0
+    assert sched.gauge(b) == 0.5
+
+
+def test_dead_actors_are_dropped_lazily_and_keep_the_cycle():
+    actors = _actors(10, 10, 10, 10)
+    sched = TurnScheduler(actors)
+    assert _take(sched, 2) == ["A0", "A1"]
+    actors[2].take_damage(100)
+    # The dead entry is still queued until it reaches the top
+    assert len(sched) == 4
+    assert _take(sched, 4) == ["A3", "A0", "A1", "A3"]
+    assert len(sched) == 3
+    assert actors[2] not in sched
+
+
+def test_removed_actors_never_act_again():
+    actors = _actors(10, 10, 10)
+    sched = TurnScheduler(actors)
+    sched.remove(actors[0])
+    assert _take(sched, 4) == ["A1", "A2", "A1", "A2"]
+
+    sched.add(actors[0])  # rejoins a full wait from now
+    assert _take(sched, 3) == ["A1", "A2", "A0"]
+
+
+def test_empty_when_everyone_is_down():
+    actors = _actors(10, 10)
+    sched = TurnScheduler(actors)
+    for a in actors:
+        a.take_damage(100)
+    assert sched.current() is None
+    sched.end_turn()
+    assert sched.turns == 0
@@ -1,6 +1,8 @@
 import os
-from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pygame
+from utils.atlas import load_atlas
 
 
 def _assets_root_dir() -> str:
@@ -20,39 +22,221 @@ def _candidate_filenames(name: str):
     yield f"{base.replace(' ', '_')}.png"
 
 
-@lru_cache(maxsize=256)
+class AssetManifest:
+    """Index of assets/ built with one directory scan: category -> {filename: path}.
+    Lookups are dict probes instead of os.path.isfile calls; call scan() again
+    after adding files at runtime."""
+    def __init__(self, root=None):
+        self.root = root or _assets_root_dir()
+        self.files = {}
+        self.scan()
+
+    def scan(self):
+        self.files = {}
+        if not os.path.isdir(self.root):
+            return
+        for entry in os.scandir(self.root):
+            if entry.is_dir():
+                self.files[entry.name] = {f.name: f.path for f in os.scandir(entry.path) if f.is_file()}
+
+    def resolve(self, category, name):
+        """Path for name in category (trying the usual filename variants), the
+        category's default.png, or None."""
+        files = self.files.get(category)
+        if not files:
+            return None
+        for cand in _candidate_filenames(name):
+            if cand in files:
+                return files[cand]
+        return files.get("default.png")
+
+
+class SpriteLoader:
+    """Decoded sprites keyed by path, with background preloading. Categories
+    packed with use_atlases() are served as atlas subsurfaces instead.
+    preload() decodes files on a thread pool; pump() (called once per frame by
+    engine.Game) finishes them with convert_alpha on the main thread, which
+    needs the display. get() blocks only for sprites that were never preloaded
+    or are still being decoded."""
+    def __init__(self, manifest, workers=2):
+        self.manifest = manifest
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0  # get() had to block on an in-flight preload
+        self.preloaded = 0
+        self._surfaces = {}  # path -> Surface or None if it failed to decode
+        self._pending = {}   # path -> Future of the decoded, unconverted surface
+        self._pool = None
+        self.atlases = {}    # category -> utils.atlas.Atlas
+
+    def use_atlases(self, categories, cache_dir=None):
+        """Pack (or load the cached packing of) each category's PNGs; needs the display mode set."""
+        for category in categories:
+            files = {n: p for n, p in self.manifest.files.get(category, {}).items() if n.lower().endswith(".png")}
+            if files:
+                self.atlases[category] = load_atlas(category, files, cache_dir)
+
+    def _from_atlas(self, category, path):
+        atlas = self.atlases.get(category)
+        return atlas.get(os.path.basename(path)) if atlas is not None else None
+
+    def preload(self, category, names):
+        for name in names:
+            path = self.manifest.resolve(category, name)
+            if path is None or path in self._surfaces or path in self._pending:
+                continue
+            if category in self.atlases and os.path.basename(path) in self.atlases[category]:
+                continue
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="assets")
+            self._pending[path] = self._pool.submit(pygame.image.load, path)
+
+    def pump(self):
+        """Finish decoded preloads; returns how many became available."""
+        if not self._pending:
+            return 0
+        done = [p for p, fut in self._pending.items() if fut.done()]
+        for path in done:
+            self._finish(path)
+            self.preloaded += 1
+        return len(done)
+
+    def busy(self):
+        return bool(self._pending)
+
+    def _finish(self, path):
+        try:
+            surface = self._pending.pop(path).result().convert_alpha()
+        except Exception:
+            surface = self._fallback(path)
+        self._surfaces[path] = surface
+        return surface
+
+    def _fallback(self, path):
+        # A sprite that fails to decode falls back to its category's
+        # default.png, as a missing one does; None if that fails too
+        category = os.path.basename(os.path.dirname(path))
+        default = self.manifest.files.get(category, {}).get("default.png")
+        if default is None or default == path:
+            return None
+        return self.get(category, "default")
+
+    def get(self, category, name):
+        path = self.manifest.resolve(category, name)
+        if path is None:
+            return None
+        sprite = self._from_atlas(category, path)
+        if sprite is not None:
+            self.hits += 1
+            return sprite
+        if path in self._surfaces:
+            self.hits += 1
+            return self._surfaces[path]
+        if path in self._pending:
+            self.waits += 1
+            return self._finish(path)
+        self.misses += 1
+        try:
+            surface = pygame.image.load(path).convert_alpha()
+        except Exception:
+            surface = self._fallback(path)
+        self._surfaces[path] = surface
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def stats(self):
+        return {"loaded": len(self._surfaces), "atlased": sum(len(a) for a in self.atlases.values()), "pending": len(self._pending), "hits": self.hits,
+                "misses": self.misses, "waits": self.waits, "preloaded": self.preloaded}
+
+
+MANIFEST = AssetManifest()
+SPRITES = SpriteLoader(MANIFEST)
+ATLAS_CATEGORIES = ("characters", "enemies", "npcs")
+
+
 def load_sprite_for(category: str, name: str):
     """Load a sprite Surface for the given name from assets/<category>/.
     Returns a pygame.Surface or None if not found.
     """
-    assets_dir = os.path.join(_assets_root_dir(), category)
-    for cand in _candidate_filenames(name):
-        path = os.path.join(assets_dir, cand)
-        if os.path.isfile(path):
-            try:
-                return pygame.image.load(path).convert_alpha()
-            except Exception:
-                # If load fails, try next candidate
-                continue
-    # Fallback: look for a default.png in the category
-    default_path = os.path.join(assets_dir, "default.png")
-    if os.path.isfile(default_path):
-        try:
-            return pygame.image.load(default_path).convert_alpha()
-        except Exception:
-            pass
-    return None
+    return SPRITES.get(category, name)
+
+
+def preload_sprites(category: str, names):
+    """Start decoding sprites in the background so a later load_sprite_for is a cache hit."""
+    SPRITES.preload(category, names)
+
+
+class ScaledSurfaceCache:
+    """LRU of scaled surfaces keyed by (source surface, target box).
+    Bounded by the total pixel memory of the cached results; least recently
+    used entries are evicted first. Source surfaces are keyed by identity, so
+    call invalidate() if one is drawn on after it has been scaled.
+    """
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (surface, w, h) -> (scaled, nbytes)
+
+    def get(self, surface, target_w, target_h):
+        key = (surface, target_w, target_h)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        scaled = _smoothscale_to_fit(surface, target_w, target_h)
+        nbytes = scaled.get_width() * scaled.get_height() * scaled.get_bytesize()
+        self._entries[key] = (scaled, nbytes)
+        self.bytes += nbytes
+        # Always keep the newest entry, even if it alone exceeds the budget
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, old_bytes) = self._entries.popitem(last=False)
+            self.bytes -= old_bytes
+        return scaled
+
+    def invalidate(self, surface):
+        for key in [k for k in self._entries if k[0] is surface]:
+            self.bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
+
 
+SCALED_CACHE = ScaledSurfaceCache()
 
-def scale_to_fit(surface: pygame.Surface, target_w: int, target_h: int) -> pygame.Surface:
-    """Scale a surface to fit within target box preserving aspect ratio."""
+
+def _smoothscale_to_fit(surface, target_w, target_h):
+    sw, sh = surface.get_width(), surface.get_height()
+    scale = min(target_w / sw, target_h / sh)
+    new_size = (max(1, int(sw * scale)), max(1, int(sh * scale)))
+    return pygame.transform.smoothscale(surface, new_size)
+
+
+def scale_to_fit(surface: pygame.Surface, target_w: int, target_h: int, cache: bool = True) -> pygame.Surface:
+    """Scale a surface to fit within target box preserving aspect ratio.
+    Results are shared through SCALED_CACHE unless cache=False; treat them as read-only.
+    """
     if surface is None:
         return None
     sw, sh = surface.get_width(), surface.get_height()
     if sw == 0 or sh == 0:
         return surface
-    scale = min(target_w / sw, target_h / sh)
-    new_size = (max(1, int(sw * scale)), max(1, int(sh * scale)))
-    return pygame.transform.smoothscale(surface, new_size)
+    if not cache:
+        return _smoothscale_to_fit(surface, target_w, target_h)
+    return SCALED_CACHE.get(surface, target_w, target_h)
+
+
+def clear_scaled_cache():
+    SCALED_CACHE.clear()
 
 
@@ -0,0 +1,137 @@
+"""Texture atlases: every sprite of a category packed onto a few large pages.
+
+Sprites are shelf-packed (tallest first) onto pages of up to PAGE_SIZE
+pixels; lookups return subsurfaces of a page, so blits share the page's
+pixels. Packed pages are cached on disk as PNGs plus a JSON rect table, keyed
+by a hash of the source files, so startup reads a few files instead of one
+per sprite.
+"""
+import hashlib
+import json
+import os
+import pygame
+
+ATLAS_VERSION = 1
+PAGE_SIZE = 2048
+PADDING = 1  # transparent gap so smoothscale never bleeds in a neighbour
+
+
+def _cache_root():
+    here = os.path.dirname(os.path.abspath(__file__))
+    return os.path.normpath(os.path.join(here, "..", "cache", "atlas"))
+
+
+def shelf_pack(sizes, page_size=PAGE_SIZE, padding=PADDING):
+    """Place (w, h) boxes on shelves. Returns (positions, page_sizes) with a
+    (page, x, y) per box in input order. A box larger than page_size gets a
+    page of its own size."""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    pages = []
+    x = y = shelf_h = 0
+    limit = page_size
+    for i in order:
+        w, h = sizes[i][0] + padding, sizes[i][1] + padding
+        if pages and x + w > limit:
+            # Start a new shelf
+            x, y, shelf_h = 0, y + shelf_h, 0
+        if not pages or y + h > limit or w > limit:
+            pages.append([0, 0])
+            x = y = shelf_h = 0
+            limit = max(page_size, w, h)
+        positions[i] = (len(pages) - 1, x, y)
+        x += w
+        shelf_h = max(shelf_h, h)
+        page = pages[-1]
+        page[0], page[1] = max(page[0], x), max(page[1], y + shelf_h)
+    return positions, [tuple(p) for p in pages]
+
+
+def sources_key(files):
+    """Content key for a {name: path} set: names, sizes and mtimes."""
+    h = hashlib.sha1(f"v{ATLAS_VERSION}:{PAGE_SIZE}:{PADDING}".encode())
+    for name in sorted(files):
+        st = os.stat(files[name])
+        h.update(f"{name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()[:16]
+
+
+class Atlas:
+    def __init__(self, pages, rects):
+        self.pages = pages
+        self.rects = rects  # name -> (page, x, y, w, h)
+        self._subsurfaces = {}
+
+    def __contains__(self, name):
+        return name in self.rects
+
+    def __len__(self):
+        return len(self.rects)
+
+    def get(self, name):
+        sub = self._subsurfaces.get(name)
+        if sub is None:
+            entry = self.rects.get(name)
+            if entry is None:
+                return None
+            page, x, y, w, h = entry
+            sub = self._subsurfaces[name] = self.pages[page].subsurface((x, y, w, h))
+        return sub
+
+    @classmethod
+    def build(cls, files):
+        """Pack {name: path} images; unreadable files are skipped."""
+        images = {}
+        for name, path in sorted(files.items()):
+            try:
+                images[name] = pygame.image.load(path)
+            except (pygame.error, OSError):
+                continue
+        names = list(images)
+        positions, page_sizes = shelf_pack([images[n].get_size() for n in names])
+        pages = [pygame.Surface(size, pygame.SRCALPHA) for size in page_sizes]
+        rects = {}
+        for name, (page, x, y) in zip(names, positions):
+            img = images[name]
+            pages[page].blit(img, (x, y))
+            rects[name] = (page, x, y, img.get_width(), img.get_height())
+        return cls(pages, rects)
+
+    def save(self, directory, key):
+        os.makedirs(directory, exist_ok=True)
+        # Drop atlases packed from an older set of sources
+        for fname in os.listdir(directory):
+            if not fname.startswith(key + "_") and not fname.startswith(key + "."):
+                os.remove(os.path.join(directory, fname))
+        for i, page in enumerate(self.pages):
+            pygame.image.save(page, os.path.join(directory, f"{key}_{i}.png"))
+        # The index goes last: its presence marks a complete atlas
+        tmp = os.path.join(directory, f"{key}.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"pages": len(self.pages), "rects": self.rects}, f)
+        os.replace(tmp, os.path.join(directory, f"{key}.json"))
+
+    @classmethod
+    def load(cls, directory, key):
+        with open(os.path.join(directory, f"{key}.json")) as f:
+            index = json.load(f)
+        pages = [pygame.image.load(os.path.join(directory, f"{key}_{i}.png")) for i in range(index["pages"])]
+        return cls(pages, {name: tuple(r) for name, r in index["rects"].items()})
+
+
+def load_atlas(category, files, cache_dir=None):
+    """Atlas for a category's {filename: path}, from the disk cache when the
+    sources are unchanged. Pages are converted for fast blitting, so the
+    display mode must already be set."""
+    directory = os.path.join(cache_dir or _cache_root(), category)
+    key = sources_key(files)
+    try:
+        atlas = Atlas.load(directory, key)
+    except (OSError, ValueError, KeyError, pygame.error):
+        atlas = Atlas.build(files)
+        try:
+            atlas.save(directory, key)
+        except (OSError, pygame.error):
+            pass  # read-only install: packed in memory only
+    atlas.pages = [page.convert_alpha() for page in atlas.pages]
+    return atlas
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+import pygame
+
+
+class FontRegistry:
+    """Process-wide font registry with an LRU of rendered text surfaces.
+
+    Fonts are created once per (face, size). Rendered surfaces are keyed by
+    (font, text, color, antialias) so strings that don't change between frames
+    are rasterized once. Returned surfaces are shared; treat them as read-only.
+    """
+
+    def __init__(self, max_text_entries=1024):
+        self.max_text_entries = max_text_entries
+        self._fonts = {}
+        self._text = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size, face=None):
+        key = (face, size)
+        f = self._fonts.get(key)
+        if f is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            f = pygame.font.SysFont(face, size)
+            self._fonts[key] = f
+        return f
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        img = self._text.get(key)
+        if img is not None:
+            self._text.move_to_end(key)
+            self.hits += 1
+            return img
+        self.misses += 1
+        img = font.render(text, antialias, color)
+        self._text[key] = img
+        if len(self._text) > self.max_text_entries:
+            self._text.popitem(last=False)
+        return img
+
+    def clear_text(self):
+        self._text.clear()
+
+    def stats(self):
+        return {"fonts": len(self._fonts), "text_entries": len(self._text), "hits": self.hits, "misses": self.misses}
+
+
+FONTS = FontRegistry()
+
+
+def get_font(size, face=None):
+    return FONTS.font(size, face)
+
+
+def render_text(font, text, color, antialias=True):
+    """Cached equivalent of font.render(text, antialias, color)."""
+    return FONTS.render(font, text, color, antialias)
@@ -0,0 +1,75 @@
+from collections import defaultdict
+
+
+class SpatialHash:
+    """Grid-bucketed index of objects placed on integer tile coordinates.
+
+    Objects are tracked by identity, so unhashable records (e.g. the overworld's
+    NPC dicts) can be indexed directly. Exact-tile and 4-neighbour lookups are
+    O(1); range queries only touch the buckets overlapping the range.
+    """
+
+    def __init__(self, cell=16):
+        self.cell = cell
+        self._buckets = defaultdict(dict)  # (cx, cy) -> {id(obj): obj}
+        self._tiles = defaultdict(dict)    # (x, y) -> {id(obj): obj}
+        self._pos = {}                     # id(obj) -> (x, y)
+
+    def __len__(self):
+        return len(self._pos)
+
+    def __contains__(self, obj):
+        return id(obj) in self._pos
+
+    def insert(self, obj, x, y):
+        if id(obj) in self._pos:
+            self.remove(obj)
+        self._pos[id(obj)] = (x, y)
+        self._buckets[(x // self.cell, y // self.cell)][id(obj)] = obj
+        self._tiles[(x, y)][id(obj)] = obj
+
+    def remove(self, obj):
+        pos = self._pos.pop(id(obj), None)
+        if pos is None:
+            return False
+        x, y = pos
+        for table, key in ((self._buckets, (x // self.cell, y // self.cell)), (self._tiles, pos)):
+            entries = table[key]
+            entries.pop(id(obj), None)
+            if not entries:
+                del table[key]
+        return True
+
+    def move(self, obj, x, y):
+        self.insert(obj, x, y)
+
+    def clear(self):
+        self._buckets.clear()
+        self._tiles.clear()
+        self._pos.clear()
+
+    def at(self, x, y):
+        entries = self._tiles.get((x, y))
+        return list(entries.values()) if entries else []
+
+    def adjacent(self, x, y):
+        """Objects on the four tiles orthogonally adjacent to (x, y)."""
+        out = []
+        for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+            entries = self._tiles.get((nx, ny))
+            if entries:
+                out.extend(entries.values())
+        return out
+
+    def query(self, x0, y0, x1, y1):
+        """Yield (obj, x, y) for objects with x0 <= x < x1 and y0 <= y < y1."""
+        c = self.cell
+        for cy in range(y0 // c, (y1 - 1) // c + 1):
+            for cx in range(x0 // c, (x1 - 1) // c + 1):
+                bucket = self._buckets.get((cx, cy))
+                if not bucket:
+                    continue
+                for key, obj in bucket.items():
+                    x, y = self._pos[key]
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        yield obj, x, y
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+import pygame
+
+
+class ChunkSurfaceCache:
+    """Pre-rendered tile layer split into fixed-size chunk surfaces.
+
+    Each chunk covers chunk_tiles x chunk_tiles map tiles and is built once from
+    tile_at(x, y) and the biome color table, then blitted whole every frame.
+    Chunks are kept in an LRU of at most max_chunks entries; call
+    invalidate_tile() when a tile changes so only its chunk is rebuilt.
+    """
+
+    def __init__(self, tile_at, colors, tile_size, chunk_tiles=16, max_chunks=64):
+        self.tile_at = tile_at
+        self.colors = colors
+        self.tile_size = tile_size
+        self.chunk_tiles = chunk_tiles
+        self.max_chunks = max_chunks
+        self._chunks = OrderedDict()  # (cx, cy) -> Surface
+        self.builds = 0
+
+    def _chunk_of(self, x, y):
+        return x // self.chunk_tiles, y // self.chunk_tiles
+
+    def _build(self, cx, cy):
+        n, t = self.chunk_tiles, self.tile_size
+        surf = pygame.Surface((n * t, n * t))
+        surf.fill((0, 0, 0))
+        x0, y0 = cx * n, cy * n
+        for ty in range(n):
+            for tx in range(n):
+                biome = self.tile_at(x0 + tx, y0 + ty)
+                color = (20, 20, 20) if biome is None else self.colors.get(biome, (255, 255, 255))
+                surf.fill(color, (tx * t, ty * t, t - 1, t - 1))
+        self.builds += 1
+        return surf
+
+    def get_chunk(self, cx, cy):
+        key = (cx, cy)
+        surf = self._chunks.get(key)
+        if surf is not None:
+            self._chunks.move_to_end(key)
+            return surf
+        surf = self._build(cx, cy)
+        self._chunks[key] = surf
+        while len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+        return surf
+
+    def invalidate_tile(self, x, y):
+        self._chunks.pop(self._chunk_of(x, y), None)
+
+    def clear(self):
+        self._chunks.clear()
+
+    def draw(self, screen, cam_x, cam_y, view_w, view_h):
+        """Blit the chunks covering the view (in tiles) with the camera at (cam_x, cam_y)."""
+        n, t = self.chunk_tiles, self.tile_size
+        cx0, cy0 = self._chunk_of(cam_x, cam_y)
+        cx1, cy1 = self._chunk_of(cam_x + view_w - 1, cam_y + view_h - 1)
+        old_clip = screen.get_clip()
+        screen.set_clip(pygame.Rect(0, 0, view_w * t, view_h * t).clip(old_clip))
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                surf = self.get_chunk(cx, cy)
+                screen.blit(surf, ((cx * n - cam_x) * t, (cy * n - cam_y) * t))
+        screen.set_clip(old_clip)
@@ -0,0 +1,210 @@
+import os
+import tempfile
+from collections import OrderedDict
+import numpy as np
+from mapgen import BIOME_NAMES, BIOME_IDS, REGION, generate_ids, sample_coords
+
+CHUNK = 8 * REGION  # tiles per chunk side; a multiple of REGION keeps patches aligned
+SAMPLE_RADIUS = 48  # spawn/quest sampling window around a point, in tiles
+PREFETCH_RADIUS = 24  # keep chunks within this many tiles of the camera resident
+SEARCH_RINGS = 8  # how many chunk rings nearest_tile_of_type searches before giving up
+
+
+def _zigzag(n):
+    # Map signed chunk coordinates onto non-negative ints for SeedSequence
+    return (n << 1) if n >= 0 else ((-n << 1) - 1)
+
+
+class WorldRow:
+    """Row view so ChunkedWorld supports world[y][x] like MapGrid."""
+    __slots__ = ("world", "y")
+
+    def __init__(self, world, y):
+        self.world = world
+        self.y = y
+
+    def __getitem__(self, x):
+        return self.world.tile(x, self.y)
+
+    def __setitem__(self, x, biome):
+        self.world.set_tile(x, self.y, biome)
+
+
+class ChunkedWorld:
+    """Unbounded biome map generated lazily, one chunk at a time.
+
+    Every chunk is derived only from (seed, chunk coordinate), so an evicted
+    chunk can simply be regenerated. Chunks that were edited through set_tile
+    are spilled to disk on eviction and read back on the next access. At most
+    max_resident chunks are kept in memory.
+    """
+
+    width = height = None
+
+    def __init__(self, seed=None, chunk_size=CHUNK, max_resident=64, spill_dir=None):
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % (2**63))
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.max_resident = max_resident
+        self._spill_dir = spill_dir
+        self._tmpdir = None
+        self._resident = OrderedDict()  # (cx, cy) -> uint8 array
+        self._dirty = set()             # resident chunks edited since generation/load
+        self._spilled = set()           # chunks whose edited copy lives on disk
+        self._last_key = None
+        self._last_ids = None
+        self.mapped_path = None  # save file restored chunks are mapped from (savegame.load_game)
+        self.stats = {"generated": 0, "loaded": 0, "spilled": 0, "evicted": 0}
+
+    # ----- Chunk storage -----
+    def _generate(self, cx, cy):
+        rng = np.random.default_rng([self.seed, _zigzag(cx), _zigzag(cy)])
+        ids = generate_ids(self.chunk_size, self.chunk_size, rng)
+        self.stats["generated"] += 1
+        return ids
+
+    def _spill_path(self, key):
+        if self._spill_dir is None:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="jrpg_chunks_")
+            self._spill_dir = self._tmpdir.name
+        os.makedirs(self._spill_dir, exist_ok=True)
+        return os.path.join(self._spill_dir, f"chunk_{key[0]}_{key[1]}.npy")
+
+    def _materialize(self, key):
+        if key in self._spilled:
+            self.stats["loaded"] += 1
+            return np.load(self._spill_path(key))
+        return self._generate(*key)
+
+    def _chunk(self, key):
+        if key == self._last_key:
+            return self._last_ids
+        ids = self._resident.get(key)
+        if ids is None:
+            ids = self._materialize(key)
+            self._resident[key] = ids
+            while len(self._resident) > self.max_resident:
+                self._evict()
+        else:
+            self._resident.move_to_end(key)
+        self._last_key, self._last_ids = key, ids
+        return ids
+
+    def _peek(self, key):
+        # Read-only access that doesn't disturb the resident set
+        ids = self._resident.get(key)
+        return ids if ids is not None else self._materialize(key)
+
+    def _evict(self):
+        key, ids = self._resident.popitem(last=False)
+        if key in self._dirty:
+            self._dirty.discard(key)
+            np.save(self._spill_path(key), ids)
+            self._spilled.add(key)
+            self.stats["spilled"] += 1
+        if key == self._last_key:
+            self._last_key = self._last_ids = None
+        self.stats["evicted"] += 1
+
+    def resident_count(self):
+        return len(self._resident)
+
+    def edited_chunks(self):
+        """(key, ids) for every chunk changed since generation, resident or spilled."""
+        for key in sorted(self._dirty | self._spilled):
+            ids = self._resident.get(key)
+            yield key, ids if ids is not None else np.load(self._spill_path(key))
+
+    def restore_chunk(self, key, ids):
+        """Install an edited chunk (e.g. from a save); it is kept across eviction."""
+        self._resident[key] = ids
+        self._resident.move_to_end(key)
+        self._dirty.add(key)
+        self._spilled.discard(key)
+        if key == self._last_key:
+            self._last_key = self._last_ids = None
+        while len(self._resident) > self.max_resident:
+            self._evict()
+
+    def detach(self):
+        """Copy restored chunks out of the buffer they view (a save file
+        mapping), so the file can be replaced."""
+        for key, ids in list(self._resident.items()):
+            if ids.base is not None:
+                self._resident[key] = ids.copy()
+        self._last_key = self._last_ids = None
+
+    # ----- World interface shared with mapgen.MapGrid -----
+    def __getitem__(self, y):
+        return WorldRow(self, y)
+
+    def tile(self, x, y):
+        cx, lx = divmod(x, self.chunk_size)
+        cy, ly = divmod(y, self.chunk_size)
+        return BIOME_NAMES[self._chunk((cx, cy)).item(ly, lx)]
+
+    def set_tile(self, x, y, biome):
+        cx, lx = divmod(x, self.chunk_size)
+        cy, ly = divmod(y, self.chunk_size)
+        self._chunk((cx, cy))[ly, lx] = BIOME_IDS[biome]
+        self._dirty.add((cx, cy))
+
+    def in_bounds(self, x, y):
+        return True
+
+    def clamp(self, x, y):
+        return x, y
+
+    def sample_bounds(self, center):
+        x, y = center
+        return x - SAMPLE_RADIUS, y - SAMPLE_RADIUS, x + SAMPLE_RADIUS + 1, y + SAMPLE_RADIUS + 1
+
+    def sample_tiles(self, biomes, count, rng, center, min_dist=0):
+        """Up to count distinct tiles of the given biomes within SAMPLE_RADIUS of center."""
+        cs = self.chunk_size
+        x0, y0, x1, y1 = self.sample_bounds(center)
+        targets = [BIOME_IDS[b] for b in biomes]
+        all_xs, all_ys = [], []
+        for cy in range(y0 // cs, (y1 - 1) // cs + 1):
+            for cx in range(x0 // cs, (x1 - 1) // cs + 1):
+                ys, xs = np.nonzero(np.isin(self._peek((cx, cy)), targets))
+                xs, ys = xs + cx * cs, ys + cy * cs
+                keep = (xs >= x0) & (xs < x1) & (ys >= y0) & (ys < y1)
+                all_xs.append(xs[keep])
+                all_ys.append(ys[keep])
+        return sample_coords(np.concatenate(all_xs), np.concatenate(all_ys), count, rng, center, min_dist)
+
+    def prefetch(self, x, y, radius=PREFETCH_RADIUS):
+        """Make the chunks within radius tiles of (x, y) resident."""
+        cs = self.chunk_size
+        for cy in range((y - radius) // cs, (y + radius) // cs + 1):
+            for cx in range((x - radius) // cs, (x + radius) // cs + 1):
+                if (cx, cy) not in self._resident:
+                    self._chunk((cx, cy))
+
+    def nearest_tile_of_type(self, start, biome, max_rings=SEARCH_RINGS):
+        """Closest (x, y) of the given biome by Manhattan distance, searching
+        outwards ring by ring of chunks; start itself if none is found."""
+        cs = self.chunk_size
+        sx, sy = start
+        scx, scy = sx // cs, sy // cs
+        target = BIOME_IDS[biome]
+        best, best_d = None, None
+        for ring in range(max_rings + 1):
+            # Every tile in this ring is at least (ring - 1) * cs + 1 tiles away
+            if best is not None and (ring - 1) * cs + 1 > best_d:
+                break
+            for cy in range(scy - ring, scy + ring + 1):
+                for cx in range(scx - ring, scx + ring + 1):
+                    if max(abs(cx - scx), abs(cy - scy)) != ring:
+                        continue
+                    ys, xs = np.nonzero(self._peek((cx, cy)) == target)
+                    if len(xs) == 0:
+                        continue
+                    d = np.abs(xs + cx * cs - sx) + np.abs(ys + cy * cs - sy)
+                    i = int(np.argmin(d))
+                    if best is None or d[i] < best_d:
+                        best_d = int(d[i])
+                        best = (int(xs[i]) + cx * cs, int(ys[i]) + cy * cs)
+        return best if best is not None else (sx, sy)
@@ -0,0 +1,134 @@
+"""On-disk cache of generated worlds: the biome grid plus its spawn tables.
+
+A world is fully determined by (seed, size, spawn counts, GENERATOR_VERSION):
+spawns draw from an RNG derived from the world seed, not from the session's
+streams. Each world is stored under a content key built from those, so a
+repeat boot costs one file read. Pre-bake worlds with
+
+    python worldcache.py --seeds 1337 --size 64 64
+"""
+import argparse
+import hashlib
+import os
+import random
+import struct
+import time
+import numpy as np
+from entities import NPC_NAMES
+from mapgen import MapGrid, generate_map
+from quests import NODE_BIOMES
+
+GENERATOR_VERSION = 1  # bump whenever generate_map or the spawn rules change
+CACHE_DIR = os.environ.get("JRPG_WORLD_CACHE") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cache", "worlds")
+NODE_MIN_DIST = 7  # quest nodes keep clear of the start tile
+
+_MAGIC = b"JRPGWRLD"
+_HEADER = struct.Struct("<8sIIII")  # magic, width, height, npc count, node count
+
+STATS = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def spawn_npcs(world, count, rng, center):
+    # Mostly in towns/cities, sampled straight from the biome index
+    spots = world.sample_tiles(("town", "city"), count, rng, center=center)
+    return [{"x": x, "y": y, "name": rng.choice(NPC_NAMES)} for x, y in spots]
+
+
+def build_world(seed, width, height, npc_count, node_count):
+    """Generate (grid, npcs, quest_nodes) from scratch."""
+    grid = generate_map(width, height, seed=seed)
+    rng = random.Random(f"{seed}:spawns")
+    center = (width // 2, height // 2)
+    spots = grid.sample_tiles(NODE_BIOMES, node_count, rng, center=center, min_dist=NODE_MIN_DIST)
+    nodes = [{"x": x, "y": y, "taken": False} for x, y in spots]
+    npcs = spawn_npcs(grid, npc_count, rng, center)
+    return grid, npcs, nodes
+
+
+def world_key(seed, width, height, npc_count, node_count):
+    text = f"{seed}:{width}x{height}:{npc_count}:{node_count}:v{GENERATOR_VERSION}"
+    return hashlib.sha256(text.encode()).hexdigest()[:20]
+
+
+def world_path(seed, width, height, npc_count, node_count, cache_dir=None):
+    key = world_key(seed, width, height, npc_count, node_count)
+    return os.path.join(cache_dir or CACHE_DIR, f"world_{key}.bin")
+
+
+def write_world(path, grid, npcs, nodes):
+    from savegame import write_atomic
+    out = bytearray(_HEADER.pack(_MAGIC, grid.width, grid.height, len(npcs), len(nodes)))
+    out += np.ascontiguousarray(grid.ids, dtype=np.uint8).tobytes()
+    for qn in nodes:
+        out += struct.pack("<ii", qn["x"], qn["y"])
+    for npc in npcs:
+        name = npc["name"].encode("utf-8")
+        out += struct.pack("<iiH", npc["x"], npc["y"], len(name)) + name
+    write_atomic(path, bytes(out))
+    return len(out)
+
+
+def read_world(path):
+    # One read into a writable buffer; the grid is a view on it, not a copy
+    with open(path, "rb") as f:
+        buf = bytearray(os.fstat(f.fileno()).st_size)
+        f.readinto(buf)
+    magic, width, height, npc_count, node_count = _HEADER.unpack_from(buf, 0)
+    if magic != _MAGIC:
+        raise ValueError(f"{path} is not a world cache file")
+    off = _HEADER.size
+    ids = np.frombuffer(buf, dtype=np.uint8, count=width * height, offset=off).reshape(height, width)
+    off += width * height
+    nodes = []
+    for x, y in struct.iter_unpack("<ii", bytes(buf[off:off + 8 * node_count])):
+        nodes.append({"x": x, "y": y, "taken": False})
+    off += 8 * node_count
+    npcs = []
+    for _ in range(npc_count):
+        x, y, n = struct.unpack_from("<iiH", buf, off)
+        off += 10
+        npcs.append({"x": x, "y": y, "name": buf[off:off + n].decode("utf-8")})
+        off += n
+    return MapGrid(ids), npcs, nodes
+
+
+def load_world(seed, width, height, npc_count, node_count, cache_dir=None):
+    """(grid, npcs, quest_nodes) from the cache, generating and storing it on a miss."""
+    path = world_path(seed, width, height, npc_count, node_count, cache_dir)
+    if os.path.isfile(path):
+        try:
+            world = read_world(path)
+            STATS["hits"] += 1
+            return world
+        except (OSError, ValueError, struct.error):
+            STATS["errors"] += 1  # unreadable or truncated: rebuild it below
+    STATS["misses"] += 1
+    world = build_world(seed, width, height, npc_count, node_count)
+    try:
+        write_world(path, *world)
+    except OSError:
+        STATS["errors"] += 1  # read-only install: still playable, just uncached
+    return world
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pre-bake generated worlds into the on-disk cache")
+    ap.add_argument("--seeds", nargs="*", type=int, default=[1337])
+    ap.add_argument("--size", nargs=2, type=int, default=[64, 64], metavar=("W", "H"))
+    ap.add_argument("--npcs", type=int, default=40)
+    ap.add_argument("--nodes", type=int, default=8)
+    ap.add_argument("--dir", help=f"cache directory (default {CACHE_DIR})")
+    args = ap.parse_args(argv)
+
+    w, h = args.size
+    for seed in args.seeds:
+        t0 = time.perf_counter()
+        world = build_world(seed, w, h, args.npcs, args.nodes)
+        path = world_path(seed, w, h, args.npcs, args.nodes, args.dir)
+        size = write_world(path, *world)
+        print(f"seed {seed} {w}x{h}: {size} bytes in {(time.perf_counter() - t0) * 1000:.1f} ms -> {path}")
+
+
+if __name__ == "__main__":
+    main()